@@ -0,0 +1,264 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+from .CliffordSpace import _algebra
+from .CliffordNumbers import ClNumber, ClVector
+
+
+class ClBlade:
+    '''
+    A k-blade of Clifford Algebra kept in factored form, i.e. as the outer product of its k spanning vectors
+    times a scale, named as ClBlade. Its memory is linear in the dimensions of the Algebra, while the
+    equivalent ClNumber holds up to d!/(k!(d-k)!) coordinates.
+        e.g.    ClBlade(cl3, [[1,0,0],[1,1,0]]) := e1^(e1+e2) = e1e2
+
+    Parameters
+    ----------
+
+    cl: Cl
+        An object of type Cl describing the Clifford Algebra
+
+    vectors: [ClVector] or numpy.ndarray
+        The k spanning vectors of the blade, as ClVector objects or as an array of shape (k, d)
+
+    scale: float
+        The scalar multiplying the outer product of the vectors
+    '''
+    __slots__ = ('cl', 'vectors', 'scale', '_factors')
+
+    def __init__(self, cl, vectors, scale=1.0):
+
+        self.cl = _algebra(cl)
+        self.vectors = np.array([v._transform2numpy() if isinstance(v, ClVector) else np.asarray(v, dtype=float)
+                                 for v in vectors]).reshape(-1, self.cl.dimensions)
+        self.scale = float(scale)
+        self._factors = None
+
+    @property
+    def dimensions(self):
+
+        return self.cl.dimensions
+
+    @property
+    def truncation(self):
+
+        return self.cl.truncation
+
+    @property
+    def coordinates(self):
+        '''
+        The coordinates of the expanded blade, see _transform2ClNumber(), so that a blade may be an operand of the
+        products and sums of ClNumber objects, e.g. vector**blade
+        '''
+        return self._transform2ClNumber().coordinates
+
+    @property
+    def truncationError(self):
+
+        return 0.0
+
+    def _grade(self):
+
+        return len(self.vectors)
+
+    def _orthonormalize(self):
+        '''
+        Orthonormalizes the spanning vectors of the blade, so that B = magnitude * q1^q2^...^qk. The result is cached.
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The orthonormal vectors as a numpy array of shape (d, k) and the signed magnitude of the blade as type of float
+        '''
+        if self._factors is None:
+            if self._grade() == 0:
+                self._factors = (np.zeros((self.cl.dimensions, 0)), self.scale)
+            else:
+                basis, r = np.linalg.qr(self.vectors.T)
+                self._factors = (basis, self.scale*float(np.prod(np.diag(r))))
+        return self._factors
+
+    def _basis(self):
+        '''
+        Returns an orthonormal basis of the subspace of the blade as a numpy array of shape (d, k)
+        '''
+        return self._orthonormalize()[0]
+
+    def _norm(self):
+        '''
+        Calculates the norm of a Clifford Blade
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The norm of the Clifford blade as type of float
+        '''
+        return abs(self._orthonormalize()[1])
+
+    def _normalize(self):
+        '''
+        Normalizes a Clifford Blade so as to have norm equal to one, keeping its orientation
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The normalized Clifford blade as type of ClBlade, spanned by orthonormal vectors
+        '''
+        basis, magnitude = self._orthonormalize()
+        normalized = ClBlade(self.cl, basis.T, np.sign(magnitude))
+        normalized._factors = (basis, normalized.scale)
+        return normalized
+
+    def _contraction(self, vector):
+        '''
+        Calculates the left contraction of a vector onto the Clifford Blade, i.e. vector|blade
+            e.g.    e1 | e1e2 = e2
+
+        Parameters
+        ----------
+
+        vector: ClVector or numpy.ndarray
+            The contracted vector
+
+        Returns
+        -------
+
+            The result of the left contraction as a new object of type ClBlade, of grade k-1
+        '''
+        vector = vector._transform2numpy() if isinstance(vector, ClVector) else np.asarray(vector, dtype=float)
+        basis, magnitude = self._orthonormalize()
+        components = basis.T @ vector
+        length = np.linalg.norm(components)
+        if length == 0 or magnitude == 0:
+            return ClBlade(self.cl, basis.T[1:], 0.0)
+        # Rotate the basis within the subspace so that its first vector is along the contracted vector
+        rotation,_ = np.linalg.qr(np.column_stack([components, np.eye(len(components))]))
+        if rotation[:,0] @ components < 0:
+            rotation[:,0] = -rotation[:,0]
+        rotated = basis @ rotation
+        return ClBlade(self.cl, rotated.T[1:], magnitude*np.linalg.det(rotation)*length)
+
+    def _projection(self, vector):
+        '''
+        Calculates the projection of a vector onto the subspace of the Clifford Blade
+
+        Parameters
+        ----------
+
+        vector: ClVector or numpy.ndarray
+            The projected vector
+
+        Returns
+        -------
+
+            The projection as a new object of type ClVector
+        '''
+        vector = vector._transform2numpy() if isinstance(vector, ClVector) else np.asarray(vector, dtype=float)
+        basis = self._basis()
+        return ClVector(self.cl, basis @ (basis.T @ vector))
+
+    def _rejection(self, vector):
+        '''
+        Calculates the rejection of a vector from the subspace of the Clifford Blade, i.e. its component orthogonal to it
+
+        Parameters
+        ----------
+
+        vector: ClVector or numpy.ndarray
+            The rejected vector
+
+        Returns
+        -------
+
+            The rejection as a new object of type ClVector
+        '''
+        vector = vector._transform2numpy() if isinstance(vector, ClVector) else np.asarray(vector, dtype=float)
+        basis = self._basis()
+        return ClVector(self.cl, vector - basis @ (basis.T @ vector))
+
+    def _transform2ClNumber(self):
+        '''
+        Expands the Clifford Blade to its coordinates in the orthonormal basis of the Algebra
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The expanded blade as a new object of type ClNumber
+        '''
+        expanded = ClNumber(self.cl, {'': self.scale})
+        for vector in self.vectors:
+            expanded = expanded^ClVector(self.cl, vector)
+        return expanded
+
+    def __xor__(self, other):
+        '''
+        Calculates the outer (wedge) product of the Clifford Blade with a vector or another ClBlade, by appending their factors.
+            e.g.    blade^vector
+
+        Parameters
+        ----------
+
+        other: ClBlade, ClVector or numpy.ndarray
+            The blade or vector to calculate the outer product with
+
+        Returns
+        -------
+
+            The result of the outer product as a new object of type ClBlade
+        '''
+        if isinstance(other, ClBlade):
+            return ClBlade(self.cl, np.vstack([self.vectors, other.vectors]), self.scale*other.scale)
+        return ClBlade(self.cl, list(self.vectors)+[other], self.scale)
+
+    def __neg__(self):
+
+        return ClBlade(self.cl, self.vectors, -self.scale)
+
+    def __rmul__(self, scalar):
+        '''
+        Multiplies the Clifford Blade with a scalar value
+            e.g.    scalar*blade
+        '''
+        return ClBlade(self.cl, self.vectors, scalar*self.scale)
@@ -0,0 +1,748 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+from types import MappingProxyType
+from .CliffordSpace import Cl, _algebra
+from .DualNumbers import Dual, stack
+from .CliffordSparse import ClSparse
+
+
+# Products with fewer pairs of terms are faster with the loops over the coordinate dictionaries
+SPARSE_PAIRS = 16
+
+
+def _negligible(value, epsilon):
+    '''
+    Checks if a coordinate, which may also be an array or a dual number, is negligible
+    '''
+    if isinstance(value, Dual):
+        return value._negligible(epsilon)
+    if isinstance(value, np.ndarray):
+        return bool(np.all(np.abs(value) <= epsilon))
+    return abs(value) <= epsilon
+
+def _magnitude(value):
+    '''
+    Returns the largest absolute value of a coordinate, which may also be an array or a dual number
+    '''
+    if isinstance(value, Dual):
+        value = value.value
+    return float(np.max(np.abs(value)))
+
+
+class ClNumber:
+    '''
+    A number of Clifford Algebra named as Cl-number
+
+    Parameters
+    ----------
+
+    cl: Cl
+        An object of type Cl describing the Clifford Algebra
+
+    coordinates: {'name': float}
+        The coordinates of the Cl-number in the orthonormal basis
+        e.g.    ClVector(cl2, {'e1': 1.0, 'e2': 2.0})
+                ClVector(cl3, {'e1': 1.0, 'e2': 2.0, 'e3': 3.0})
+        The coordinates may also be arrays or Dual numbers, which carry their derivatives through all operations
+        The truncation policy of the Algebra, if any, applies to the products of Cl-numbers with real coordinates, and
+        the bound of the error of the truncated terms is kept in truncationError
+    The Cl-numbers keep a reference to the interned Algebra and no instance dictionary, so that millions of them
+    may be held at once.
+    '''
+    __slots__ = ('cl', '_coordinates', 'truncationError')
+
+    def __init__(self, cl, coordinates):
+
+        self.cl = cl if type(cl) is Cl else _algebra(cl)
+        self.truncationError = 0.0
+        # Read-only views, e.g. the coordinates of a ClVector, are copied so that the small elements can be discarded
+        self._coordinates = coordinates if type(coordinates) is dict else dict(coordinates)
+        self._discardElements()
+
+    @property
+    def dimensions(self):
+
+        return self.cl.dimensions
+
+    @property
+    def truncation(self):
+
+        return self.cl.truncation
+
+    @property
+    def coordinates(self):
+
+        return self._coordinates
+
+    @coordinates.setter
+    def coordinates(self, coordinates):
+
+        self._coordinates = coordinates
+
+    def _discardElements(self,epsilon=1e-10):
+        '''
+        Discards from the Clifford number all the existing elements with very small coordinates
+            e.g. ClNum := {'e1': 1.0, 'e2': 0.0, 'e3': 2.0}
+                 ClNum.discard_elements() := {'e1': 1.0, 'e3': 2.0}
+
+        Parameters
+        ----------
+
+        epsilon: float
+            The smallest absolute value of the kept coordinates
+
+        Returns
+        -------
+        
+            None
+        '''
+        names = list()
+        for name,value in self.coordinates.items():
+            
+            # Plain floats, the common case, are checked without the dispatch of _negligible()
+            if (abs(value) <= epsilon) if type(value) is float else _negligible(value, epsilon):
+                names.append(name)
+        
+        for name in names:
+            
+            self.coordinates.pop(name, None)
+        pass
+
+    def _sparseProduct(self, cliffordNumber, product, truncation=None):
+        '''
+        Calculates a product with the vectorized engine of ClSparse, if it applies to the two Clifford numbers
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the product with
+
+        product: str
+            The product, one of 'geometric', 'inner', 'outer' and 'left'
+
+        truncation: Truncation
+            The approximation policy, or None for the policy of the Algebra
+
+        Returns
+        -------
+
+            The result of the product as a new object of type ClNumber, or None if there are fewer than SPARSE_PAIRS
+            pairs of terms without a truncation policy, or some coordinates are arrays or Dual numbers
+        '''
+        truncation = self.truncation if truncation is None else truncation
+        # The coordinates of a ClVector are built from its array on every read, so they are read once
+        coordinates1, coordinates2 = self.coordinates, cliffordNumber.coordinates
+        if truncation is None and len(coordinates1)*len(coordinates2) < SPARSE_PAIRS:
+            return None
+        for coordinates in (coordinates1, coordinates2):
+            if not all(isinstance(value, (int, float, np.integer, np.floating)) for value in coordinates.values()):
+                return None
+        result = ClSparse(self.cl, coordinates1)._product(ClSparse(self.cl, coordinates2), product, truncation)
+        return self._propagate(cliffordNumber, ClNumber(self.cl, result._transform2coordinates()), result.dropped)
+
+    def _product(self, cliffordNumber, product='geometric', truncation=None):
+        '''
+        Calculates a product between two Clifford numbers with an approximation policy for this operation only
+            e.g.    clNum1._product(clNum2, 'geometric', Truncation(maxTerms=1024))
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the product with
+
+        product: str
+            The product, one of 'geometric', 'inner', 'outer' and 'left'
+
+        truncation: Truncation
+            The approximation policy, or None for the policy of the Algebra
+
+        Returns
+        -------
+
+            The result of the product as a new object of type ClNumber
+        '''
+        result = self._sparseProduct(cliffordNumber, product, truncation)
+        if result is not None:
+            return result
+        operators = {'geometric': ClNumber.__mul__, 'inner': ClNumber.__pow__, 'outer': ClNumber.__xor__,
+                     'left': ClNumber.__or__}
+        if product not in operators:
+            raise ValueError('Unknown product '+str(product)+', expected one of '+str(tuple(operators)))
+        return operators[product](self, cliffordNumber)
+
+    def _propagate(self, cliffordNumber, result, dropped=0.0):
+        '''
+        Sets the bound of the error of a product from the truncated terms of the product and of its two factors. The sum
+        of the absolute coordinates of a product is not larger than the product of the sums of its factors, so that
+            |xy - x'y'| <= e_x*|y'| + |x'|*e_y + e_x*e_y + dropped
+        '''
+        error1, error2 = self.truncationError, cliffordNumber.truncationError
+        if error1 or error2:
+            dropped += error1*cliffordNumber._absoluteSum() + self._absoluteSum()*error2 + error1*error2
+        result.truncationError = dropped
+        return result
+
+    def _absoluteSum(self):
+
+        return sum(_magnitude(v) for v in self.coordinates.values())
+
+    def _changeSign(self, nameExpanded):
+
+        sortedIndexes = np.array(sorted(range(len(nameExpanded)), key=lambda k: nameExpanded[k]))
+        return int(np.sum(np.abs(np.arange(len(sortedIndexes))-sortedIndexes))/2)%2==1
+
+    def _norm(self):
+        '''
+        Calculates the norm of a Clifford number
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The norm of the Clifford number as type of float, or of Dual for dual coordinates
+        '''
+        sq = 0
+        for _,value in self.coordinates.items():
+
+            sq += pow(value,2)
+        
+        if isinstance(sq, (Dual, np.ndarray)):
+            return sq**0.5
+        return  float(sq**(float(1)/2))
+
+    def _normalize(self):
+        '''
+        Normalizes a Clifford Blade so as to have norm equal to one
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The normalized Clifford number as type of ClNumber
+        '''
+        norm = self._norm()
+        return self.__rmul__(1/norm)
+
+
+    def __add__(self,cliffordNumber):
+        '''
+        Calculates the elementwise addition between two Clifford numbers. The elementwise addition is calculated with the addition operator (+) between two ClNumber objects.
+            e.g.    ClNum1+ClNum2
+        
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to add
+
+        Returns
+        -------
+
+            The result of the elementwise addition as a new object of type ClNumber
+        '''
+        resultedCoordinates = self.coordinates.copy()
+        
+        for name,value in cliffordNumber.coordinates.items():
+
+                if name in resultedCoordinates:
+                    resultedCoordinates[name] += value
+
+                else:
+                    resultedCoordinates.update({name: value})
+
+        result = ClNumber(self.cl, resultedCoordinates)
+        result.truncationError = self.truncationError + cliffordNumber.truncationError
+        return result
+
+    def __sub__(self,cliffordNumber):
+        '''
+        Calculates the elementwise subtraction between two Clifford numbers. The elementwise subtraction is calculated with the subtraction operator (-) between two ClNumber objects.
+            e.g.    ClNum1-ClNum2
+        
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to subtract
+
+        Returns
+        -------
+
+            The result of the elementwise subtraction as a new object of type ClNumber
+        '''
+        resultedCoordinates = self.coordinates.copy()
+
+        for name,value in cliffordNumber.coordinates.items():
+
+                if name in resultedCoordinates:
+                    resultedCoordinates[name] -= value
+
+                else:
+                    resultedCoordinates.update({name: -value})
+                    
+        result = ClNumber(self.cl, resultedCoordinates)
+        result.truncationError = self.truncationError + cliffordNumber.truncationError
+        return result
+    
+    def __mul__(self,cliffordNumber):
+        '''
+        Calculates the geometrical product between two Clifford numbers. The geometrical product is calculated using the multiplication operator (*) between two objects of type ClNumber.
+            e.g.    clNum1*clNum2
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the geometrical product with
+
+        Returns
+        -------
+
+            The result of the geometrical product as a new object of type ClNumber
+        '''
+        result = self._sparseProduct(cliffordNumber, 'geometric')
+        if result is not None:
+            return result
+
+        resultedCoordinates = dict()
+
+        coordinates2 = cliffordNumber.coordinates
+        for name1,value1 in self.coordinates.items():
+
+            nameExpanded1 = self.cl._expand2basis(name1)
+
+            for name2,value2 in coordinates2.items():
+
+                nameExpanded2 = self.cl._expand2basis(name2)
+                nameExpanded = nameExpanded1 + nameExpanded2
+
+                U = self.cl._union(nameExpanded1, nameExpanded2)
+                I = self.cl._intersection(nameExpanded1, nameExpanded2)
+                [U.remove(n) for n in I]
+                name = sorted([self.cl._complete(n) for n in U]) 
+                if len(name) > 0:
+                    name = 'e'+'e'.join(name)
+                else:
+                    name=''
+                
+                value = value1*value2
+
+                if self._changeSign(nameExpanded):
+                    value = -value
+
+                if name in resultedCoordinates:
+                    resultedCoordinates[name] += value
+                else:
+                    resultedCoordinates.update({name: value})
+
+        return self._propagate(cliffordNumber, ClNumber(self.cl, resultedCoordinates))
+
+    def __pow__(self,cliffordNumber):
+        '''
+        Calculates the inner (kind of dot) product between two Clifford numbers. The inner product is calculated using the pow operator (**) between two objects of type ClNumber.
+            e.g.    clNum1**clNum2
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the inner product with
+
+        Returns
+        -------
+
+            The result of the inner product as a new object of type ClNumber
+        '''
+        result = self._sparseProduct(cliffordNumber, 'inner')
+        if result is not None:
+            return result
+
+        resultedCoordinates = dict()
+
+        coordinates2 = cliffordNumber.coordinates
+        for name1,value1 in self.coordinates.items():
+
+            nameExpanded1 = self.cl._expand2basis(name1)
+
+            for name2,value2 in coordinates2.items():
+
+                nameExpanded2 = self.cl._expand2basis(name2)
+                
+                I = self.cl._intersection(nameExpanded1, nameExpanded2)
+
+                if I == nameExpanded1 or I == nameExpanded2:
+
+                    nameExpanded = nameExpanded1 + nameExpanded2
+
+                    U = self.cl._union(nameExpanded1, nameExpanded2)
+                    [U.remove(n) for n in I]
+                    name = sorted([self.cl._complete(n) for n in U]) 
+                    if len(name) > 0:
+                        name = 'e'+'e'.join(name)
+                    else:
+                        name=''
+                        
+                    value = value1*value2
+
+                    if self._changeSign(nameExpanded):
+                        value = -value
+
+                    if name in resultedCoordinates:
+                        resultedCoordinates[name] += value
+                    else:
+                        resultedCoordinates.update({name: value})
+
+        return self._propagate(cliffordNumber, ClNumber(self.cl, resultedCoordinates))
+
+    def __xor__(self,cliffordNumber):
+        '''
+        Calculates the outer (wedge) product between two Clifford numbers. The outer product is calculated using the XOR operator (^) between two objects of type ClNumber.
+            e.g.    clNum1^clNum2
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the outer product with
+
+        Returns
+        -------
+
+            The result of the outer product as a new object of type ClNumber
+        '''
+        result = self._sparseProduct(cliffordNumber, 'outer')
+        if result is not None:
+            return result
+
+        resultedCoordinates = dict()
+
+        coordinates2 = cliffordNumber.coordinates
+        for name1,value1 in self.coordinates.items():
+
+            nameExpanded1 = self.cl._expand2basis(name1)
+
+            for name2,value2 in coordinates2.items():
+
+                nameExpanded2 = self.cl._expand2basis(name2)
+                
+                I = self.cl._intersection(nameExpanded1, nameExpanded2)
+
+                if len(I) == 0:
+
+                    nameExpanded = nameExpanded1 + nameExpanded2
+
+                    U = self.cl._union(nameExpanded1, nameExpanded2)
+                    [U.remove(n) for n in I]
+                    name = sorted([self.cl._complete(n) for n in U]) 
+                    if len(name) > 0:
+                        name = 'e'+'e'.join(name)
+                    else:
+                        name=''
+
+                    value = value1*value2
+
+                    if self._changeSign(nameExpanded):
+                        value = -value
+
+                    if name in resultedCoordinates:
+                        resultedCoordinates[name] += value
+                    else:
+                        resultedCoordinates.update({name: value})
+
+        return self._propagate(cliffordNumber, ClNumber(self.cl, resultedCoordinates))
+
+    def __or__(self,cliffordNumber):
+        '''
+        Calculates the left contraction between two Clifford numbers. The left contraction is calculated using the OR operator (|) between two objects of type ClNumber.
+            e.g.    clNum1|clNum2
+
+        Parameters
+        ----------
+
+        cliffordNumber: ClNumber
+            An object of ClNumber class to calculate the left contraction with
+
+        Returns
+        -------
+
+            The result of the left contraction as a new object of type ClNumber
+        '''
+        result = self._sparseProduct(cliffordNumber, 'left')
+        if result is not None:
+            return result
+
+        resultedCoordinates = dict()
+
+        coordinates2 = cliffordNumber.coordinates
+        for name1,value1 in self.coordinates.items():
+
+            nameExpanded1 = self.cl._expand2basis(name1)
+
+            for name2,value2 in coordinates2.items():
+
+                nameExpanded2 = self.cl._expand2basis(name2)
+                
+                I = self.cl._intersection(nameExpanded1, nameExpanded2)
+
+                if I == nameExpanded1:
+
+                    nameExpanded = nameExpanded1 + nameExpanded2
+
+                    U = self.cl._union(nameExpanded1, nameExpanded2)
+                    [U.remove(n) for n in I]
+                    name = sorted([self.cl._complete(n) for n in U]) 
+                    if len(name) > 0:
+                        name = 'e'+'e'.join(name)
+                    else:
+                        name=''
+                        
+                    value = value1*value2
+
+                    if self._changeSign(nameExpanded):
+                        value = -value
+
+                    if name in resultedCoordinates:
+                        resultedCoordinates[name] += value
+                    else:
+                        resultedCoordinates.update({name: value})
+
+        return self._propagate(cliffordNumber, ClNumber(self.cl, resultedCoordinates))
+
+    def __neg__(self):
+        '''
+        Calculates the negation of a Clifford number. Negation is calculated with the subtraction operator (-) from the left of a ClNumber object.
+            e.g.    -clNum
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The result of the negation as a new object of type ClNumber
+        '''
+        resultedCoordinates = dict()
+        
+        for name,value in self.coordinates.items():
+            
+            resultedCoordinates.update({name: -value})
+            
+        result = ClNumber(self.cl, resultedCoordinates)
+        result.truncationError = self.truncationError
+        return result
+    
+    def __rmul__(self,scalar):
+        '''
+        Multiplies each element of a Clifford number with a scalar value. Scalar multiplication is applied with the multiplication operator (*) from the left of a ClNumber object.
+            e.g.    scalar*clNum
+
+        Parameters
+        ----------
+
+        scalar: float
+            A scalar value to multiply each element of the ClNumber
+
+        Returns
+        -------
+
+            The result of the scalar multiplication as a new object of type ClNumber
+        '''
+        resultedCoordinates = dict()
+        
+        for name,value in self.coordinates.items():
+            
+            resultedCoordinates.update({name: scalar*value})
+            
+        result = ClNumber(self.cl, resultedCoordinates)
+        if self.truncationError:
+            result.truncationError = _magnitude(scalar)*self.truncationError
+        return result
+
+
+class ClVector(ClNumber):
+    '''
+    A vector (1-blade element) of Clifford Algebra named as ClVector
+
+    Parameters
+    ----------
+
+    cl: Cl
+        An object of Cl describing the Clifford Algebra
+
+    coordinates: numpy.float64 or Dual
+        The coordinates of the Cl-number in the orthonormal basis
+        e.g.    ClVector(cl2, [1,2]) => {'e1': 1.0, 'e2': 2.0}
+                ClVector(cl3, [1,2,3]) => {'e1': 1.0, 'e2': 2.0, 'e3': 3.0}
+        Real coordinates are kept as an array, and the coordinates are a read-only view built from it whenever they
+        are read, so that they are changed by assigning new coordinates
+                
+    Raises
+    ------
+    
+        Error[1]: Number of coordinates more than basis elements of Clifford Algebra
+    '''
+    __slots__ = ('_array',)
+
+    def __init__(self, cl, coordinates):
+
+        self.cl = _algebra(cl)
+        self.truncationError = 0.0
+        self._coordinates, self._array = None, None
+
+        if len(coordinates) > self.cl.dimensions:
+            print('ERROR[1]: More values for '+str(self.cl.dimensions)+' dimensions given!')
+
+        if (isinstance(coordinates, np.ndarray) and coordinates.dtype != object) or \
+                (not isinstance(coordinates, Dual) and not any(isinstance(coord, Dual) for coord in coordinates)):
+            self._array = np.zeros(max(len(coordinates), self.cl.dimensions))
+            self._array[:len(coordinates)] = coordinates
+            return
+
+        self._coordinates = dict()
+        for counter,coord in enumerate(coordinates):
+ 
+            if isinstance(coord, Dual):
+                if not coord._negligible(0):
+                    self._coordinates.update({'e'+self.cl._complete(str(counter+1)): coord})
+
+            elif coord != 0:
+
+                self._coordinates.update({'e'+self.cl._complete(str(counter+1)): float(coord)})
+
+    @property
+    def coordinates(self):
+
+        if self._array is not None:
+            # A read-only view is built on every read and the array is kept, so that reading a vector does not enlarge
+            # it, and changes through the view fail instead of being lost
+            indexes = np.flatnonzero(self._array)
+            return MappingProxyType({'e'+self.cl._complete(str(index+1)): value
+                                     for index,value in zip(indexes.tolist(), self._array[indexes].tolist())})
+        return self._coordinates
+
+    @coordinates.setter
+    def coordinates(self, coordinates):
+
+        self._coordinates, self._array = coordinates, None
+
+    def _arrays(self, cliffordNumber):
+        '''
+        Returns the arrays of two vectors with real coordinates of the same Algebra, or None if any of them has no array
+        '''
+        if isinstance(cliffordNumber, ClVector) and cliffordNumber.cl is self.cl and self._array is not None and \
+                cliffordNumber._array is not None:
+            return self._array, cliffordNumber._array
+        return None
+
+    def _fromArray(self, array, truncationError=0.0):
+        '''
+        Creates a vector of the same Algebra from an array of real coordinates
+        '''
+        result = ClVector(self.cl, array)
+        result._discardElements()
+        result.truncationError = truncationError
+        return result
+
+    def _discardElements(self, epsilon=1e-10):
+
+        if self._array is not None:
+            self._array[np.abs(self._array) <= epsilon] = 0.0
+            return
+        ClNumber._discardElements(self, epsilon)
+
+    def _norm(self):
+
+        if self._array is not None:
+            return float(np.sqrt(np.dot(self._array, self._array)))
+        return ClNumber._norm(self)
+
+    def __add__(self, cliffordNumber):
+
+        arrays = self._arrays(cliffordNumber)
+        if arrays is not None:
+            return self._fromArray(arrays[0]+arrays[1], self.truncationError+cliffordNumber.truncationError)
+        return ClNumber.__add__(self, cliffordNumber)
+
+    def __sub__(self, cliffordNumber):
+
+        arrays = self._arrays(cliffordNumber)
+        if arrays is not None:
+            return self._fromArray(arrays[0]-arrays[1], self.truncationError+cliffordNumber.truncationError)
+        return ClNumber.__sub__(self, cliffordNumber)
+
+    def __pow__(self, cliffordNumber):
+
+        arrays = self._arrays(cliffordNumber)
+        if arrays is not None:
+            result = ClNumber(self.cl, {'': float(np.dot(*arrays))})
+            return self._propagate(cliffordNumber, result)
+        return ClNumber.__pow__(self, cliffordNumber)
+
+    def __neg__(self):
+
+        if self._array is not None:
+            return self._fromArray(-self._array, self.truncationError)
+        return ClNumber.__neg__(self)
+
+    def __rmul__(self, scalar):
+
+        # Python tries the reflected method of a subclass first, so that clNum*vector must fall back to ClNumber.__mul__
+        if isinstance(scalar, ClNumber):
+            return NotImplemented
+        if self._array is not None and isinstance(scalar, (int, float, np.integer, np.floating)):
+            return self._fromArray(scalar*self._array, abs(float(scalar))*self.truncationError)
+        return ClNumber.__rmul__(self, scalar)
+
+    def _transform2numpy(self):
+
+        if self._array is not None:
+            return self._array.copy()
+
+        if any(isinstance(value, Dual) for value in self.coordinates.values()):
+            vector = [0.0]*self.dimensions
+            for name,value in self.coordinates.items():
+                vector[int(name[1:])-1] = value
+            return stack(vector)
+
+        vector = np.zeros(self.dimensions)
+        
+        for name,value in self.coordinates.items():
+
+            vector[int(name[1:])-1] = value
+
+        return vector
@@ -36,10 +36,54 @@ class Cl:
 
     dimensions: int
         The dimensions of the created Euclidean space       
+
+    truncation: Truncation
+        An approximation policy for the products of the Algebra, see CliffordSparse.Truncation, or None for exact products
+
+    The Algebras are interned, i.e. Cl(3) returns the same object every time, so that the Cl-numbers of an Algebra
+    share a single reference to it instead of copies of its attributes. Equal truncation policies select the same
+    Algebra, and the attributes of an Algebra are read-only.
     '''
-    def __init__(self, dimensions):
+    __slots__ = ('_dimensions', '_truncation')
+    _algebras = dict()
+
+    def __new__(cls, dimensions, truncation=None):
+
+        key = (int(dimensions), truncation)
+        algebra = Cl._algebras.get(key)
+        if algebra is None:
+            algebra = object.__new__(Cl)
+            object.__setattr__(algebra, '_dimensions', key[0])
+            object.__setattr__(algebra, '_truncation', truncation)
+            Cl._algebras[key] = algebra
+        return algebra
+
+    def __init__(self, dimensions, truncation=None):
+
+        # The attributes are set once by __new__ when the Algebra is interned
+        pass
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError('Algebras are read-only, create a new Cl instead')
+
+    def __getnewargs__(self):
+
+        return (self.dimensions, self.truncation)
 
-        self.dimensions = int(dimensions)
+    def __getstate__(self):
+
+        return None
+
+    @property
+    def dimensions(self):
+
+        return self._dimensions
+
+    @property
+    def truncation(self):
+
+        return self._truncation
 
     def _complete(self,element):
         '''
@@ -120,3 +164,13 @@ class Cl:
         if sort:
             lst = sorted(lst)
         return lst
+
+
+def _algebra(cl):
+    '''
+    Returns the interned Algebra of an object describing it, e.g. a Cl, a Cl-number, a ClSparse or a ClBlade
+    '''
+    cl = getattr(cl, 'cl', cl)
+    if type(cl) is Cl:
+        return cl
+    return Cl(cl.dimensions, getattr(cl, 'truncation', None))
@@ -0,0 +1,354 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+from .CliffordSpace import _algebra
+
+
+PRODUCTS = ('geometric', 'inner', 'outer', 'left')
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(x):
+        return np.bitwise_count(x)
+else:
+    _BYTECOUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(x):
+        x = np.ascontiguousarray(x)
+        return _BYTECOUNTS[x.view(np.uint8)].reshape(x.shape+(8,)).sum(axis=-1)
+
+
+class Truncation:
+    '''
+    An approximation policy for the products of Clifford numbers, applied while the terms of a product are accumulated,
+    so that the intermediate results of high-dimensional products remain small. The sum of the absolute values of all
+    the dropped terms is kept as a bound of the error of the result.
+        e.g.    cl = Cl(512, truncation=Truncation(threshold=1e-6, maxTerms=4096))
+                (rotor*vector*rotorS).truncationError := the bound of the error of the sandwich product
+
+    Parameters
+    ----------
+
+    threshold: float
+        The smallest kept absolute value, relative to the largest product of two coefficients of the factors
+
+    topK: int
+        The largest number of kept terms of each grade
+
+    maxTerms: int
+        The largest number of kept terms
+
+    epsilon: float
+        The smallest kept absolute value, as for ClNumber._discardElements()
+
+    blockPairs: int
+        The number of pairs of terms accumulated before each truncation
+
+    The policies are read-only and compare by their settings, so that equal policies select the same interned Algebra.
+    '''
+    __slots__ = ('threshold', 'topK', 'maxTerms', 'epsilon', 'blockPairs')
+
+    def __init__(self, threshold=0.0, topK=None, maxTerms=None, epsilon=1e-10, blockPairs=2**16):
+
+        for name,value in zip(Truncation.__slots__, (threshold, topK, maxTerms, epsilon, blockPairs)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError('Truncation policies are read-only, create a new Truncation instead')
+
+    def _settings(self):
+
+        return tuple(getattr(self, name) for name in Truncation.__slots__)
+
+    def __eq__(self, other):
+
+        return isinstance(other, Truncation) and self._settings() == other._settings()
+
+    def __hash__(self):
+
+        return hash(self._settings())
+
+    def __reduce__(self):
+
+        return (Truncation, self._settings())
+
+    def __repr__(self):
+
+        return 'Truncation('+', '.join(name+'='+repr(getattr(self, name)) for name in Truncation.__slots__)+')'
+
+    def _apply(self, blades, values, scale=1.0):
+        '''
+        Drops the terms of a merged sparse Clifford number that are not kept by the policy
+
+        Parameters
+        ----------
+
+        blades: numpy.ndarray
+            The blades as an array of shape (n, words) of type numpy.uint64
+
+        values: numpy.ndarray
+            The values as an array of shape (n,)
+
+        scale: float
+            The value the threshold is relative to
+
+        Returns
+        -------
+
+            The kept blades and values, and the sum of the absolute values of the dropped terms
+        '''
+        magnitudes = np.abs(values)
+        kept = magnitudes > max(self.epsilon, self.threshold*scale)
+        if self.topK is not None and np.count_nonzero(kept) > self.topK:
+            # The terms are ranked by magnitude within their grade, and the first topK of each grade are kept
+            grades = np.sum(_popcount(blades), axis=-1, dtype=np.int64)
+            order = np.lexsort((-magnitudes, ~kept, grades))
+            starts = np.searchsorted(grades[order], grades[order], side='left')
+            ranks = np.empty(len(values), dtype=np.int64)
+            ranks[order] = np.arange(len(values)) - starts
+            kept &= ranks < self.topK
+        if self.maxTerms is not None and np.count_nonzero(kept) > self.maxTerms:
+            largest = np.argpartition(np.where(kept, -magnitudes, np.inf), self.maxTerms-1)[:self.maxTerms]
+            kept = np.zeros(len(values), dtype=bool)
+            kept[largest] = True
+        return blades[kept], values[kept], float(np.sum(magnitudes[~kept]))
+
+
+class ClSparse:
+    '''
+    A number of Clifford Algebra stored as parallel arrays of blade indexes and values, named as ClSparse. Each basis
+    blade is a bitset of its basis vectors, held in words of 64 bits, so that the products between all pairs of terms
+    are computed with NumPy operations over the arrays instead of a loop per pair of terms.
+        e.g.    ClSparse(cl3, {'e1': 1.0, 'e1e3': 2.0}) := blades [[0b001], [0b101]], values [1.0, 2.0]
+
+    Parameters
+    ----------
+
+    cl: Cl
+        An object of type Cl describing the Clifford Algebra
+
+    coordinates: {'name': float}
+        The coordinates of the Cl-number in the orthonormal basis, as for ClNumber
+    '''
+    __slots__ = ('cl', 'blades', 'values', 'dropped')
+
+    def __init__(self, cl, coordinates):
+
+        self.cl = _algebra(cl)
+        self.dropped = 0.0
+        words = self._words()
+        self.blades = np.zeros((len(coordinates), words), dtype=np.uint64)
+        self.values = np.zeros(len(coordinates))
+        for row,(name,value) in enumerate(coordinates.items()):
+
+            indexes = [int(n)-1 for n in self.cl._expand2basis(name)]
+            bitset = 0
+            for index in indexes:
+                bitset |= 1 << index
+            for word in range(words):
+                self.blades[row, word] = (bitset >> 64*word) & 0xFFFFFFFFFFFFFFFF
+            # Names given out of order, e.g. 'e2e1', are reordered with the sign of the permutation
+            if indexes != sorted(indexes):
+                inversions = sum(1 for i in range(len(indexes)) for j in range(i+1, len(indexes)) if indexes[i] > indexes[j])
+                value = -value if inversions%2 else value
+            self.values[row] = value
+        self.blades, self.values = self._merge(self.blades, self.values)
+
+    def _words(self):
+
+        return max(1, -(-self.cl.dimensions//64))
+
+    def _fromArrays(self, blades, values):
+        '''
+        Creates a ClSparse of the same Algebra from arrays of blades and values without conversions
+        '''
+        result = ClSparse.__new__(ClSparse)
+        result.cl = self.cl
+        result.dropped = 0.0
+        result.blades, result.values = blades, values
+        return result
+
+    def _merge(self, blades, values, epsilon=1e-10):
+        '''
+        Sums the values of duplicate blades with a sort-and-reduce and discards the elements with very small values,
+        with the same epsilon as ClNumber._discardElements()
+
+        Parameters
+        ----------
+
+        blades: numpy.ndarray
+            The blades as an array of shape (n, words) of type numpy.uint64
+
+        values: numpy.ndarray
+            The values as an array of shape (n,)
+
+        epsilon: float
+            The largest absolute value of the discarded coordinates
+
+        Returns
+        -------
+
+            The merged blades and values
+        '''
+        if len(values) > 0:
+            order = np.lexsort(blades.T[::-1])
+            blades, values = blades[order], values[order]
+            starts = np.flatnonzero(np.r_[True, np.any(blades[1:] != blades[:-1], axis=1)])
+            blades, values = blades[starts], np.add.reduceat(values, starts)
+        kept = np.abs(values) > epsilon
+        return blades[kept], values[kept]
+
+    def _prefixParity(self):
+        '''
+        Calculates for every blade the bitset whose bit i is set if the blade holds an odd number of basis vectors below i.
+        The inclusive prefix parity of a word is formed by doubling shifts, and the parity of the lower words is carried over.
+        '''
+        parity = self.blades.copy()
+        for shift in (1, 2, 4, 8, 16, 32):
+            parity ^= parity << np.uint64(shift)
+        wordParity = (parity >> np.uint64(63)) & np.uint64(1)
+        carry = np.cumsum(wordParity, axis=1, dtype=np.uint64) - wordParity
+        return (parity << np.uint64(1)) ^ (np.uint64(0) - (carry & np.uint64(1)))
+
+    def _product(self, clSparse, product='geometric', truncation=None):
+        '''
+        Calculates a product between two sparse Clifford numbers over all pairs of their terms at once. The pairs kept by
+        each product are selected with a vectorized mask on the common basis vectors of their blades:
+            geometric: all pairs,  inner: one blade contained in the other,  outer: no common vectors,
+            left: the first blade contained in the second (left contraction)
+        With a truncation policy the pairs are accumulated in blocks of rows, and the policy is applied after each merge
+        of the pending pairs into the accumulated terms.
+
+        Parameters
+        ----------
+
+        clSparse: ClSparse
+            An object of ClSparse class to calculate the product with
+
+        product: str
+            The product, one of PRODUCTS
+
+        truncation: Truncation
+            The approximation policy, or None for the policy of the Algebra
+
+        Returns
+        -------
+
+            The result of the product as a new object of type ClSparse, with the sum of the absolute values of the
+            dropped terms in its attribute dropped
+        '''
+        if product not in PRODUCTS:
+            raise ValueError('Unknown product '+str(product)+', expected one of '+str(PRODUCTS))
+        truncation = self.cl.truncation if truncation is None else truncation
+        if truncation is None or len(self.values) == 0 or len(clSparse.values) == 0:
+            return self._fromArrays(*self._merge(*self._pairs(clSparse, product, self.blades, self.values)))
+
+        parity = clSparse._prefixParity()
+        magnitudes, largest = np.abs(self.values), np.max(np.abs(clSparse.values))
+        scale = np.max(magnitudes)*largest
+        # The rows whose products with every term of clSparse are below the threshold are skipped, and the sums of the
+        # absolute values of their products are added to the dropped terms.
+        skipped = magnitudes*largest < truncation.threshold*scale
+        dropped = float(np.sum(magnitudes[skipped])*np.sum(np.abs(clSparse.values)))
+        blades, values = self.blades[~skipped], self.values[~skipped]
+
+        rows = max(1, truncation.blockPairs//len(clSparse.values))
+        accumulated = (np.zeros((0, self._words()), dtype=np.uint64), np.zeros(0))
+        pending, pendingPairs = list(), 0
+        for start in range(0, len(values), rows):
+            pending.append(self._pairs(clSparse, product, blades[start:start+rows], values[start:start+rows], parity))
+            pendingPairs += len(pending[-1][1])
+            # The accumulated terms are merged again only once the pending pairs outnumber them, so that the cost of
+            # the merges stays proportional to the number of pairs
+            if pendingPairs < max(truncation.blockPairs, len(accumulated[1])) and start+rows < len(values):
+                continue
+            merged = self._merge(np.concatenate([accumulated[0]]+[pair[0] for pair in pending]),
+                                 np.concatenate([accumulated[1]]+[pair[1] for pair in pending]), 0)
+            *accumulated, mergeDropped = truncation._apply(*merged, scale)
+            dropped += mergeDropped
+            pending, pendingPairs = list(), 0
+        result = self._fromArrays(*accumulated)
+        result.dropped = dropped
+        return result
+
+    def _pairs(self, clSparse, product, blades, values, parity=None):
+        '''
+        Calculates the signed products of the kept pairs between some terms, given as blades and values, and all the
+        terms of clSparse, without merging the duplicate blades. The prefix parity of clSparse may be given precomputed.
+        '''
+        if parity is None:
+            parity = clSparse._prefixParity()
+        blades1, blades2 = blades[:,None,:], clSparse.blades[None,:,:]
+        common = blades1 & blades2
+        if product == 'geometric':
+            mask = np.ones(common.shape[:2], dtype=bool)
+        elif product == 'outer':
+            mask = ~np.any(common, axis=-1)
+        elif product == 'left':
+            mask = np.all(common == blades1, axis=-1)
+        else:
+            mask = np.all(common == blades1, axis=-1) | np.all(common == blades2, axis=-1)
+        rows, columns = np.nonzero(mask)
+
+        left, right = blades[rows], clSparse.blades[columns]
+        swaps = np.sum(_popcount(left & parity[columns]), axis=-1, dtype=np.int64)
+        return left ^ right, values[rows]*clSparse.values[columns]*(1-2*(swaps%2))
+
+    def _transform2coordinates(self):
+        '''
+        Converts the sparse Clifford number to the coordinates dictionary of ClNumber
+
+        Parameters
+        ----------
+
+            None
+
+        Returns
+        -------
+
+            The coordinates as type of {'name': float}
+        '''
+        bits = np.unpackbits(self.blades.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        rows, indexes = np.nonzero(bits)
+        bounds = np.searchsorted(rows, np.arange(len(self.values)+1)).tolist()
+        basis = ['e'+self.cl._complete(str(index+1)) for index in range(bits.shape[1])]
+        names = [basis[index] for index in indexes.tolist()]
+        return {''.join(names[bounds[row]:bounds[row+1]]): value for row,value in enumerate(self.values.tolist())}
+
+    def __mul__(self, clSparse):
+
+        return self._product(clSparse, 'geometric')
+
+    def __pow__(self, clSparse):
+
+        return self._product(clSparse, 'inner')
+
+    def __xor__(self, clSparse):
+
+        return self._product(clSparse, 'outer')
+
+    def __or__(self, clSparse):
+
+        return self._product(clSparse, 'left')
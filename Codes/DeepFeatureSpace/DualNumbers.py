@@ -0,0 +1,328 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numbers
+import numpy as np
+
+
+class Dual:
+    '''
+    A dual number for forward-mode differentiation, holding a value and its derivatives with respect to P parameters.
+    Dual numbers take part in NumPy ufuncs, matrix products and sums, as well as in the coordinates of ClNumber objects,
+    so that an expression and its derivatives are calculated in the same vectorized pass.
+        e.g.    x = variable(np.linspace(0, 1, 5))
+                y = np.exp(2*x)
+                y.value := exp(2x),   y.tangent[...,0] := 2exp(2x)
+
+    Parameters
+    ----------
+
+    value: numpy.ndarray or float
+        The value of the dual number, of any shape S
+
+    tangent: numpy.ndarray
+        The derivatives of the value with respect to each parameter, of shape S+(P,)
+    '''
+    def __init__(self, value, tangent):
+
+        self.value = np.asarray(value, dtype=float)
+        self.tangent = np.asarray(tangent, dtype=float)
+
+    @property
+    def shape(self):
+
+        return self.value.shape
+
+    @property
+    def ndim(self):
+
+        return self.value.ndim
+
+    def __len__(self):
+
+        return len(self.value)
+
+    def __iter__(self):
+
+        for i in range(len(self.value)):
+            yield self[i]
+
+    def __getitem__(self, key):
+
+        key = key if isinstance(key, tuple) else (key,)
+        tangent = np.moveaxis(self.tangent, -1, 0)[(slice(None),)+key]
+        return Dual(self.value[key], np.moveaxis(tangent, 0, -1))
+
+    def __repr__(self):
+
+        return 'Dual('+repr(self.value)+', '+repr(self.tangent)+')'
+
+    def _negligible(self, epsilon):
+        '''
+        Returns true if both the value and the derivatives are not larger than epsilon in absolute value
+        '''
+        return bool(np.all(np.abs(self.value) <= epsilon) and np.all(np.abs(self.tangent) <= epsilon))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+
+        if method != '__call__' or kwargs.get('out') is not None:
+            return NotImplemented
+        if not all(isinstance(x, (Dual, np.ndarray, numbers.Number)) for x in inputs):
+            return NotImplemented
+        if ufunc is np.matmul:
+            return _matmul(*inputs)
+        rule = _RULES.get(ufunc)
+        if rule is None:
+            return NotImplemented
+        values = [x.value if isinstance(x, Dual) else np.asarray(x, dtype=float) for x in inputs]
+        tangents = [x.tangent if isinstance(x, Dual) else None for x in inputs]
+        value = ufunc(*values)
+        tangent = rule(value, values, tangents)
+        return Dual(value, np.broadcast_to(tangent, value.shape+tangent.shape[-1:]))
+
+    def __array_function__(self, func, types, args, kwargs):
+
+        if func is np.sum:
+            return _sum(*args, **kwargs)
+        if func is np.linalg.norm:
+            return _norm(*args, **kwargs)
+        return NotImplemented
+
+    def _binary(ufunc, reflected=False):
+
+        def operator(self, other):
+            if not isinstance(other, (Dual, np.ndarray, numbers.Number)):
+                return NotImplemented
+            return ufunc(other, self) if reflected else ufunc(self, other)
+        return operator
+
+    __add__, __radd__ = _binary(np.add), _binary(np.add, True)
+    __sub__, __rsub__ = _binary(np.subtract), _binary(np.subtract, True)
+    __mul__, __rmul__ = _binary(np.multiply), _binary(np.multiply, True)
+    __truediv__, __rtruediv__ = _binary(np.true_divide), _binary(np.true_divide, True)
+    __pow__, __rpow__ = _binary(np.power), _binary(np.power, True)
+    __matmul__, __rmatmul__ = _binary(np.matmul), _binary(np.matmul, True)
+    del _binary
+
+    def __neg__(self):
+
+        return Dual(-self.value, -self.tangent)
+
+    def __pos__(self):
+
+        return self
+
+    def __abs__(self):
+
+        return np.absolute(self)
+
+
+def _scaled(factor, tangent):
+    '''
+    Multiplies a tangent of shape S+(P,) with a factor broadcastable to S, or returns None for a constant
+    '''
+    if tangent is None:
+        return None
+    return np.expand_dims(factor, -1)*tangent
+
+def _total(*terms):
+
+    terms = [term for term in terms if term is not None]
+    total = terms[0]
+    for term in terms[1:]:
+        total = total+term
+    return total
+
+def _power(value, values, tangents):
+
+    x, y = values
+    terms = [_scaled(y*np.power(x, y-1), tangents[0])]
+    if tangents[1] is not None:
+        terms.append(_scaled(value*np.log(x), tangents[1]))
+    return _total(*terms)
+
+def _maximum(value, values, tangents):
+
+    x, y = values
+    first = x >= y
+    return _total(_scaled(first, tangents[0]), _scaled(~first, tangents[1]))
+
+_RULES = {
+    np.add: lambda v, x, t: _total(t[0], t[1]),
+    np.subtract: lambda v, x, t: _total(t[0], None if t[1] is None else -t[1]),
+    np.multiply: lambda v, x, t: _total(_scaled(x[1], t[0]), _scaled(x[0], t[1])),
+    np.true_divide: lambda v, x, t: _total(_scaled(1/x[1], t[0]), _scaled(-v/x[1], t[1])),
+    np.power: _power,
+    np.maximum: _maximum,
+    np.negative: lambda v, x, t: -t[0],
+    np.absolute: lambda v, x, t: _scaled(np.sign(x[0]), t[0]),
+    np.square: lambda v, x, t: _scaled(2*x[0], t[0]),
+    np.sqrt: lambda v, x, t: _scaled(0.5/v, t[0]),
+    np.exp: lambda v, x, t: _scaled(v, t[0]),
+    np.log: lambda v, x, t: _scaled(1/x[0], t[0]),
+    np.cos: lambda v, x, t: _scaled(-np.sin(x[0]), t[0]),
+    np.sin: lambda v, x, t: _scaled(np.cos(x[0]), t[0]),
+    np.tanh: lambda v, x, t: _scaled(1-v**2, t[0]),
+    np.arccos: lambda v, x, t: _scaled(-1/np.sqrt(1-x[0]**2), t[0]),
+    np.arctan2: lambda v, x, t: _total(_scaled(x[1]/(x[0]**2+x[1]**2), t[0]), _scaled(-x[0]/(x[0]**2+x[1]**2), t[1])),
+}
+
+def _matmul(x, y):
+    '''
+    Calculates the matrix product of dual numbers or arrays, with the semantics of numpy.matmul
+    '''
+    vx = x.value if isinstance(x, Dual) else np.asarray(x, dtype=float)
+    vy = y.value if isinstance(y, Dual) else np.asarray(y, dtype=float)
+    value = vx @ vy
+    terms = list()
+    if isinstance(x, Dual):
+        # The parameters axis is moved first, so that it is broadcast as a batch axis of the product
+        terms.append(np.moveaxis(np.moveaxis(x.tangent, -1, 0) @ vy, 0, -1))
+    if isinstance(y, Dual):
+        if vy.ndim == 1:
+            terms.append(vx @ y.tangent)
+        else:
+            terms.append(np.moveaxis(vx @ np.moveaxis(y.tangent, -1, 0), 0, -1))
+    return Dual(value, _total(*terms))
+
+def _sum(x, axis=None, keepdims=False, **kwargs):
+
+    if axis is None:
+        axis = tuple(range(x.ndim))
+    axes = tuple(np.atleast_1d(axis) % max(x.ndim, 1)) if x.ndim else ()
+    return Dual(np.sum(x.value, axis=axes, keepdims=keepdims), np.sum(x.tangent, axis=axes, keepdims=keepdims))
+
+def _norm(x, ord=None, axis=None, keepdims=False):
+
+    if ord is not None:
+        raise ValueError('Unsupported norm order '+str(ord)+', only the Euclidean norm of dual numbers is supported')
+    return np.sqrt(_sum(x*x, axis=axis, keepdims=keepdims))
+
+def value(x):
+    '''
+    Returns the value of a dual number, or the input itself if it is not a dual number
+    '''
+    return x.value if isinstance(x, Dual) else x
+
+def derivative(x, parameter=None):
+    '''
+    Returns the derivatives of a dual number, with respect to all parameters or to the given one
+
+    Parameters
+    ----------
+
+    x: Dual or numpy.ndarray
+        The differentiated quantity. Anything else than a dual number is treated as a constant
+
+    parameter: int
+        The index of the parameter, or None for all of them along the last axis
+
+    Returns
+    -------
+
+        The derivatives as a numpy array
+    '''
+    if not isinstance(x, Dual):
+        x = np.asarray(x, dtype=float)
+        return np.zeros(x.shape) if parameter is not None else np.zeros(x.shape+(1,))
+    return x.tangent if parameter is None else x.tangent[...,parameter]
+
+def variable(x):
+    '''
+    Seeds an array of independent evaluation points of one parameter, e.g. a range of norms, so that every element is
+    differentiated with respect to itself
+
+    Returns
+    -------
+
+        The seeded dual number, with tangent of shape x.shape+(1,)
+    '''
+    x = np.asarray(x, dtype=float)
+    return Dual(x, np.ones(x.shape+(1,)))
+
+def variables(*xs):
+    '''
+    Seeds several parameters at once, each with its own derivative slot
+        e.g.    R, theta = variables(2.0, 0.5)
+
+    Returns
+    -------
+
+        A list of dual numbers, the i-th with a unit derivative along parameter i
+    '''
+    seeded = list()
+    for i, x in enumerate(xs):
+        x = np.asarray(x, dtype=float)
+        tangent = np.zeros(x.shape+(len(xs),))
+        tangent[...,i] = 1
+        seeded.append(Dual(x, tangent))
+    return seeded
+
+def entry(x, index, parameters=1, parameter=0):
+    '''
+    Seeds a single entry of an array as a parameter, e.g. one weight of a class, keeping the rest of the array constant
+
+    Parameters
+    ----------
+
+    x: numpy.ndarray
+        The array
+
+    index: tuple
+        The index of the seeded entry
+
+    parameters: int
+        The total number of parameters of the calculation
+
+    parameter: int
+        The derivative slot of the entry
+
+    Returns
+    -------
+
+        The array as a dual number
+    '''
+    x = np.asarray(x, dtype=float)
+    tangent = np.zeros(x.shape+(parameters,))
+    tangent[tuple(np.atleast_1d(index))+(parameter,)] = 1
+    return Dual(x, tangent)
+
+def stack(items):
+    '''
+    Stacks floats, arrays and dual numbers of the same shape along a new first axis, as numpy.array does for floats
+
+    Returns
+    -------
+
+        The stacked dual number, or a numpy array if none of the items is a dual number
+    '''
+    duals = [item for item in items if isinstance(item, Dual)]
+    if not duals:
+        return np.array(items, dtype=float)
+    parameters = duals[0].tangent.shape[-1]
+    shape = np.broadcast_shapes(*[np.shape(value(item)) for item in items])
+    values = np.array([np.broadcast_to(value(item), shape) for item in items])
+    tangents = np.array([np.broadcast_to(item.tangent, shape+(parameters,)) if isinstance(item, Dual)
+                         else np.zeros(shape+(parameters,)) for item in items])
+    return Dual(values, tangents)
@@ -0,0 +1,49 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+
+
+def loadSpace(path):
+    '''
+    Loads a feature space from a csv file with the layout used by the GUI, i.e. the first column
+    holds the feature vector and every following column holds the weight vector of one class.
+
+    Parameters
+    ----------
+
+    path: str
+        The path of the csv file
+
+    Returns
+    -------
+
+        The feature vector as a numpy array of shape (d,) and the weight matrix as a numpy array
+        of shape (classes, d)
+    '''
+    # pandas is only needed here, so it is not imported with the package
+    import pandas as pd
+    df = pd.read_csv(path)
+    columns = [np.array(value, dtype=float) for _, value in df.items()]
+    return columns[0], np.array(columns[1:])
@@ -0,0 +1,408 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import os
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .WeightIndex import WeightIndex
+
+
+QUANTITIES = ('norm', 'angle', 'rival')
+
+
+class QuantileSketch:
+    '''
+    A mergeable sketch of the quantiles of a positive quantity for every class, with a bounded relative error. Values
+    are counted in logarithmic buckets [gamma^(i-1), gamma^i), gamma = (1+accuracy)/(1-accuracy), over a fixed range,
+    so that two sketches with the same settings are merged by adding their counts.
+        e.g.    sketch._add(labels, norms)
+                sketch._quantiles([0.5, 0.99]) := the median and the 99th percentile of every class
+
+    Parameters
+    ----------
+
+    classes: int
+        The number of classes
+
+    accuracy: float
+        The relative accuracy of the quantiles
+
+    minimum: float
+        The smallest distinguished value, smaller values are counted as zero
+
+    maximum: float
+        The largest distinguished value, larger values are counted in the last bucket
+    '''
+    def __init__(self, classes, accuracy=0.01, minimum=1e-6, maximum=1e6):
+
+        self.accuracy = accuracy
+        self.minimum = minimum
+        self.maximum = maximum
+        self.gamma = (1+accuracy)/(1-accuracy)
+        self.offset = int(np.floor(np.log(minimum)/np.log(self.gamma))) - 1
+        buckets = int(np.ceil(np.log(maximum)/np.log(self.gamma))) - self.offset + 1
+        # Bucket 0 holds the values below the minimum
+        self.counts = np.zeros((classes, buckets), dtype=np.int64)
+
+    def _add(self, labels, values):
+        '''
+        Counts the values of a chunk, each in the sketch of its class
+        '''
+        values = np.asarray(values, dtype=float)
+        buckets = np.zeros(len(values), dtype=np.int64)
+        positive = values >= self.minimum
+        buckets[positive] = np.ceil(np.log(values[positive])/np.log(self.gamma)).astype(np.int64) - self.offset
+        np.clip(buckets, 0, self.counts.shape[1]-1, out=buckets)
+        self.counts += np.bincount(labels*self.counts.shape[1]+buckets,
+                                   minlength=self.counts.size).reshape(self.counts.shape)
+        pass
+
+    def _merge(self, sketch):
+
+        if (sketch.accuracy, sketch.minimum, sketch.maximum, sketch.counts.shape) != \
+                (self.accuracy, self.minimum, self.maximum, self.counts.shape):
+            raise ValueError('Only sketches with the same settings can be merged')
+        self.counts += sketch.counts
+        return self
+
+    def _quantiles(self, q):
+        '''
+        Calculates quantiles of every class
+
+        Parameters
+        ----------
+
+        q: numpy.ndarray
+            The quantiles in [0, 1]
+
+        Returns
+        -------
+
+            The quantiles as a numpy array of shape (classes, len(q)), with nan for the classes without values
+        '''
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        cumulative = np.cumsum(self.counts, axis=1)
+        totals = cumulative[:,-1:]
+        ranks = np.maximum(np.ceil(q[None]*totals), 1)
+        buckets = np.array([np.searchsorted(row, rank) for row, rank in zip(cumulative, ranks)]).reshape(len(totals), len(q))
+        # The middle of each bucket, in relative terms, is returned
+        values = 2*self.gamma**(buckets+self.offset)/(self.gamma+1)
+        values[buckets == 0] = 0.0
+        values[totals[:,0] == 0] = np.nan
+        return values
+
+
+class FeatureStatistics:
+    '''
+    Running statistics of the feature vectors of every class, computed chunk by chunk in constant memory and mergeable
+    across workers and runs: for the norm of the feature vectors, their angle to the weight of their own class and their
+    angle to the weight of the nearest rival class, the mean and variance, a histogram and a quantile sketch. Feature
+    vectors of zero norm have no angles, so they are only counted in the norm statistics and in zeros, and heads of a
+    single class have no rival statistics.
+        e.g.    statistics = FeatureStatistics(weights)
+                for features, labels in readChunks('features.npy', 'labels.npy'):
+                    statistics._update(features, labels)
+
+    Parameters
+    ----------
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    normBins: int
+        The number of bins of the norm histograms
+
+    normRange: (float, float)
+        The range of the norm histograms, values outside it are counted in the first or last bin
+
+    angleBins: int
+        The number of bins of the angle histograms over [0, pi]
+
+    accuracy: float
+        The relative accuracy of the quantile sketches, see QuantileSketch
+    '''
+    def __init__(self, weights, normBins=256, normRange=(0.0, 64.0), angleBins=180, accuracy=0.01):
+
+        self.weights = np.array(weights, dtype=float)
+        self.index = WeightIndex(self.weights)
+        self.settings = {'normBins': int(normBins), 'normRange': [float(r) for r in normRange],
+                         'angleBins': int(angleBins), 'accuracy': float(accuracy)}
+        classes = len(self.weights)
+        self.edges = {'norm': np.linspace(*normRange, normBins+1), 'angle': np.linspace(0, np.pi, angleBins+1),
+                      'rival': np.linspace(0, np.pi, angleBins+1)}
+        self.counts = np.zeros(classes, dtype=np.int64)
+        self.zeros = np.zeros(classes, dtype=np.int64)
+        self.means = {quantity: np.zeros(classes) for quantity in QUANTITIES}
+        self.squares = {quantity: np.zeros(classes) for quantity in QUANTITIES}
+        self.histograms = {quantity: np.zeros((classes, len(self.edges[quantity])-1), dtype=np.int64)
+                           for quantity in QUANTITIES}
+        self.sketches = {quantity: QuantileSketch(classes, accuracy) for quantity in QUANTITIES}
+        # The number of samples of each class (rows) whose nearest rival is each other class (columns)
+        self.rivals = np.zeros((classes, classes), dtype=np.int64)
+
+    def _update(self, features, labels):
+        '''
+        Adds a chunk of feature vectors to the statistics
+
+        Parameters
+        ----------
+
+        features: numpy.ndarray
+            The feature vectors as an array of shape (n, d)
+
+        labels: numpy.ndarray
+            The class of each feature vector as an integer array of shape (n,)
+
+        Returns
+        -------
+
+            None
+        '''
+        features = np.asarray(features, dtype=float)
+        labels = np.asarray(labels, dtype=np.int64)
+        if len(labels) == 0:
+            return
+        classes = len(self.weights)
+        norms = np.linalg.norm(features, axis=1)
+        nonzero = norms > 0
+        counts = np.bincount(labels, minlength=classes)
+        zeros = counts - np.bincount(labels[nonzero], minlength=classes)
+        self._add('norm', labels, norms, counts)
+
+        if np.any(nonzero):
+            # The angles of the feature vectors of zero norm are undefined, so they are left out
+            features, labels = features[nonzero], labels[nonzero]
+            cosines = self.index._cosines(features)
+            rows = np.arange(len(labels))
+            own = cosines[rows, labels]
+            cosines[rows, labels] = -np.inf
+            rivals = np.argmax(cosines, axis=1)
+            self._add('angle', labels, np.arccos(own), counts-zeros)
+            # A single class has no rival, and every rival cosine would be -inf
+            if classes > 1:
+                self._add('rival', labels, np.arccos(cosines[rows, rivals]), counts-zeros)
+                self.rivals += np.bincount(labels*classes+rivals, minlength=classes**2).reshape(classes, classes)
+        self.counts += counts
+        self.zeros += zeros
+        pass
+
+    def _add(self, quantity, labels, value, counts):
+        '''
+        Adds the values of a quantity of a chunk, with the number of values of every class, to its statistics
+        '''
+        classes = len(self.weights)
+        # The chunk statistics are combined with the running ones by the parallel algorithm of Chan et al.
+        means = np.bincount(labels, weights=value, minlength=classes)/np.maximum(counts, 1)
+        squares = np.bincount(labels, weights=(value-means[labels])**2, minlength=classes)
+        self._combine(quantity, counts, means, squares)
+        histogram = self.histograms[quantity]
+        bins = np.clip(np.searchsorted(self.edges[quantity], value, side='right')-1, 0, histogram.shape[1]-1)
+        histogram += np.bincount(labels*histogram.shape[1]+bins, minlength=histogram.size).reshape(histogram.shape)
+        self.sketches[quantity]._add(labels, value)
+        pass
+
+    def _samples(self, quantity):
+        '''
+        Returns the number of values of a quantity of every class, i.e. without the feature vectors of zero norm for the
+        angles, and none for the rivals of a single class
+        '''
+        if quantity == 'rival' and len(self.weights) < 2:
+            return np.zeros_like(self.counts)
+        return self.counts if quantity == 'norm' else self.counts - self.zeros
+
+    def _combine(self, quantity, counts, means, squares):
+        '''
+        Combines the running mean and sum of squared deviations of a quantity with those of another set of samples
+        '''
+        samples = self._samples(quantity)
+        total = samples + counts
+        delta = means - self.means[quantity]
+        share = np.divide(counts, total, out=np.zeros(len(total)), where=total > 0)
+        self.means[quantity] = self.means[quantity] + delta*share
+        self.squares[quantity] = self.squares[quantity] + squares + delta**2*samples*share
+        pass
+
+    def _merge(self, statistics):
+        '''
+        Merges the statistics of another part of the samples, e.g. from another worker or run, with the same weights
+        and settings
+
+        Returns
+        -------
+
+            The merged statistics, i.e. self
+        '''
+        if statistics.settings != self.settings or not np.array_equal(statistics.weights, self.weights):
+            raise ValueError('Only statistics with the same weights and settings can be merged')
+        for quantity in QUANTITIES:
+            self._combine(quantity, statistics._samples(quantity), statistics.means[quantity], statistics.squares[quantity])
+            self.histograms[quantity] += statistics.histograms[quantity]
+            self.sketches[quantity]._merge(statistics.sketches[quantity])
+        self.rivals += statistics.rivals
+        self.counts += statistics.counts
+        self.zeros += statistics.zeros
+        return self
+
+    def _variances(self, quantity):
+
+        return self.squares[quantity]/np.maximum(self._samples(quantity)-1, 1)
+
+    def _quantiles(self, quantity, q=(0.05, 0.5, 0.95)):
+        '''
+        Returns quantiles of a quantity for every class, as a numpy array of shape (classes, len(q))
+        '''
+        return self.sketches[quantity]._quantiles(q)
+
+    def _save(self, path):
+        '''
+        Saves the statistics to a npz file, so that partial results of separate runs can be merged later
+        '''
+        arrays = {'weights': self.weights, 'counts': self.counts, 'zeros': self.zeros, 'rivals': self.rivals,
+                  'settings': np.array(json.dumps(self.settings))}
+        for quantity in QUANTITIES:
+            arrays[quantity+'Means'] = self.means[quantity]
+            arrays[quantity+'Squares'] = self.squares[quantity]
+            arrays[quantity+'Histograms'] = self.histograms[quantity]
+            arrays[quantity+'Sketches'] = self.sketches[quantity].counts
+        np.savez(path, **arrays)
+        pass
+
+
+def loadStatistics(path):
+    '''
+    Loads statistics saved by FeatureStatistics._save()
+
+    Returns
+    -------
+
+        The statistics as an object of type FeatureStatistics
+    '''
+    with np.load(path) as arrays:
+        statistics = FeatureStatistics(arrays['weights'], **json.loads(str(arrays['settings'])))
+        statistics.counts = arrays['counts']
+        if 'zeros' in arrays.files:
+            statistics.zeros = arrays['zeros']
+        statistics.rivals = arrays['rivals']
+        for quantity in QUANTITIES:
+            statistics.means[quantity] = arrays[quantity+'Means']
+            statistics.squares[quantity] = arrays[quantity+'Squares']
+            statistics.histograms[quantity] = arrays[quantity+'Histograms']
+            statistics.sketches[quantity].counts = arrays[quantity+'Sketches']
+    return statistics
+
+def readChunks(path, labels=None, chunkSize=2**16):
+    '''
+    Reads a dump of feature vectors and their labels chunk by chunk. The supported layouts are:
+        .npy: an array of shape (n, d), memory mapped, with the labels in the npy file given by labels
+        .npz: the arrays 'features' and 'labels', each loaded once since npz members cannot be memory mapped
+        .csv: one feature vector per row, with the labels in the column named by labels, 'label' by default
+
+    Parameters
+    ----------
+
+    path: str
+        The path of the dump
+
+    labels: str
+        The path of the labels of a npy dump, or the label column of a csv dump
+
+    chunkSize: int
+        The number of feature vectors of each chunk
+
+    Returns
+    -------
+
+        A generator of the chunks as tuples of numpy arrays (features of shape (n, d), labels of shape (n,))
+    '''
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        # pandas is only needed here, so it is not imported with the package
+        import pandas as pd
+        column = labels or 'label'
+        for frame in pd.read_csv(path, chunksize=chunkSize):
+            yield frame.drop(columns=column).to_numpy(dtype=float), frame[column].to_numpy(dtype=np.int64)
+        return
+    if extension == '.npz':
+        with np.load(path) as arrays:
+            features, targets = arrays['features'], arrays['labels']
+    elif extension == '.npy':
+        if labels is None:
+            raise ValueError('The labels of the npy dump '+str(path)+' are required')
+        features, targets = np.load(path, mmap_mode='r'), np.load(labels, mmap_mode='r')
+    else:
+        raise ValueError('Unknown dump format '+str(extension)+', expected .npy, .npz or .csv')
+    for start in range(0, len(features), chunkSize):
+        yield np.asarray(features[start:start+chunkSize]), np.asarray(targets[start:start+chunkSize])
+
+def _collectDump(weights, settings, path, labels, chunkSize):
+
+    statistics = FeatureStatistics(weights, **settings)
+    for features, targets in readChunks(path, labels, chunkSize):
+        statistics._update(features, targets)
+    return statistics
+
+def collectStatistics(dumps, weights, chunkSize=2**16, processes=None, **settings):
+    '''
+    Collects the statistics of several dumps, each streamed by a worker process, and merges their partial results in
+    the order of the dumps. The work is divided per dump, so that a single dump is processed by a single process, and
+    the memory is constant for npy and csv dumps only, since the arrays of a npz dump are loaded whole.
+
+    Parameters
+    ----------
+
+    dumps: [str] or [(str, str)]
+        The paths of the dumps, or tuples of the paths of the dumps and of their labels, see readChunks()
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    chunkSize: int
+        The number of feature vectors of each chunk
+
+    processes: int
+        The number of worker processes, defaults to the number of cores
+
+    settings:
+        The settings of the statistics, see FeatureStatistics
+
+    Returns
+    -------
+
+        The merged statistics as an object of type FeatureStatistics
+    '''
+    tasks = [(_collectDump, weights, settings)+((dump, None) if isinstance(dump, str) else tuple(dump))+(chunkSize,)
+             for dump in dumps]
+    statistics = FeatureStatistics(weights, **settings)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            statistics._merge(task[0](*task[1:]))
+        return statistics
+    with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as executor:
+        futures = [executor.submit(*task) for task in tasks]
+        for future in futures:
+            statistics._merge(future.result())
+    return statistics
@@ -0,0 +1,266 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .FeatureSpace import loadSpace
+from .SoftmaxEngine import SoftmaxEngine
+from .SoftmaxGeometry import softmax
+
+
+QUANTITIES = ('outputs', 'softmax')
+PLOTS = ('angle', 'norm', 'surface', 'polar')
+FORMATS = ('svg', 'pdf')
+# The default settings of a job, where norms and thetas follow the ranges of the GUI
+DEFAULTS = {'quantity': 'softmax', 'plot': 'angle', 'format': 'svg', 'norms': [0.0, 20.0], 'thetas': [0.0, 2*np.pi],
+            'points': 2000, 'grid': 50, 'radii': [0.5, 1.0, 2.0, 5.0], 'classes': None, 'size': [6.4, 4.0]}
+CACHE = '.figures.json'
+# Changing the rendering invalidates the cached figures
+VERSION = 1
+
+
+def loadManifest(path):
+    '''
+    Loads a manifest of figure jobs from a json file of the form
+        {"output": "figures", "defaults": {"format": "pdf"},
+         "jobs": [{"name": "Output21", "space": "space.csv", "quantity": "softmax", "plot": "angle"}, ...]}
+    The feature space of every job is given by one of:
+        "space": the path of a csv file with the layout of the GUI, see FeatureSpace.loadSpace()
+        "features" and "weights": the feature vector and the weight matrix
+        "random": {"classes": 5, "dimensions": 13, "seed": 0} for a random space, as created by the GUI
+    The relative paths are resolved against the directory of the manifest, and two jobs may not share a name and format.
+
+    Parameters
+    ----------
+
+    path: str
+        The path of the manifest
+
+    Returns
+    -------
+
+        The jobs as a list of dictionaries, with the defaults applied, and the output directory
+    '''
+    with open(path) as file:
+        manifest = json.load(file)
+    root = os.path.dirname(os.path.abspath(path))
+    jobs, names = list(), set()
+    for job in manifest['jobs']:
+        job = {**DEFAULTS, **manifest.get('defaults', dict()), **job}
+        if (job.get('name'), job['format']) in names:
+            raise ValueError('Duplicate job '+str(job.get('name'))+'.'+str(job['format'])+' in the manifest '+str(path))
+        names.add((job.get('name'), job['format']))
+        if 'space' in job:
+            job['space'] = os.path.join(root, job['space'])
+        jobs.append(job)
+    return jobs, os.path.join(root, manifest.get('output', '.'))
+
+def _checkJob(job):
+
+    for key, options in (('quantity', QUANTITIES), ('plot', PLOTS), ('format', FORMATS)):
+        if job[key] not in options:
+            raise ValueError('Unknown '+key+' '+str(job[key])+' of job '+str(job.get('name'))+', expected one of '+str(options))
+
+def _jobSpace(job):
+    '''
+    Returns the feature vector and the weight matrix of a job
+    '''
+    if 'space' in job:
+        return loadSpace(job['space'])
+    if 'random' in job:
+        rng = np.random.default_rng(job['random'].get('seed'))
+        space = rng.standard_normal((job['random']['classes']+1, job['random']['dimensions']))
+        return space[0], space[1:]
+    return np.array(job['features'], dtype=float), np.array(job['weights'], dtype=float)
+
+def _jobKey(job, a, weights):
+    '''
+    Hashes everything a figure depends on, i.e. the settings of the job, the feature space and the rendering version
+    '''
+    settings = {key: value for key, value in job.items() if key not in ('space', 'features', 'weights')}
+    digest = hashlib.sha256(json.dumps([settings, VERSION], sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(a, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(weights, dtype=float).tobytes())
+    return digest.hexdigest()
+
+def _jobData(job, a, weights):
+    '''
+    Calculates the curves of a job with the engine of the GUI
+
+    Returns
+    -------
+
+        The horizontal axis, or the axes of a grid, the curves of shape (classes, ...) and the nearest class
+    '''
+    norms = np.linspace(*job['norms'], job['points'])
+    thetas = np.linspace(*job['thetas'], job['points'])
+    engine = SoftmaxEngine(a, weights, norms, thetas)
+    if job['plot'] in ('angle', 'norm'):
+        mode, x = ('rotate', thetas) if job['plot'] == 'angle' else ('scale', norms)
+        if job['quantity'] == 'softmax':
+            return x, engine._softmax(mode)[0], engine.ind
+        return x, engine._outputs(mode)[0], engine.ind
+    if job['plot'] == 'surface':
+        x = (np.linspace(*job['norms'], job['grid']), np.linspace(*job['thetas'], job['grid']))
+    else:
+        x = (np.array(job['radii'], dtype=float), thetas)
+    z = engine._surface(*x)
+    return x, softmax(z) if job['quantity'] == 'softmax' else z, engine.ind
+
+def _renderJob(job, a, weights, path):
+    '''
+    Renders the figure of a job to a file, with the non-interactive Figure class of matplotlib
+
+    Returns
+    -------
+
+        The path of the file
+    '''
+    # matplotlib is only needed here, so it is not imported with the package
+    from matplotlib.figure import Figure
+    x, y, ind = _jobData(job, a, weights)
+    classes = range(len(y)) if job['classes'] is None else job['classes']
+    label = 'Softmax Output' if job['quantity'] == 'softmax' else 'Output'
+    figure = Figure(figsize=job['size'])
+    if job['plot'] in ('angle', 'norm'):
+        ax = figure.subplots()
+        for i in classes:
+            ax.plot(x, y[i], label='Class '+str(i+1))
+        ax.set_xlabel('Angle (rad)' if job['plot'] == 'angle' else 'Norm')
+        ax.set_ylabel(label)
+        ax.grid(True)
+        ax.legend()
+    elif job['plot'] == 'surface':
+        ax = figure.add_subplot(projection='3d')
+        thetas, norms = np.meshgrid(x[1], x[0])
+        for i in ([ind] if job['classes'] is None else classes):
+            ax.plot_surface(thetas, norms, y[i], cmap='viridis', linewidth=0)
+        ax.set_xlabel('Angle (rad)')
+        ax.set_ylabel('Norm')
+        ax.set_zlabel(label)
+    else:
+        # The output of the dominant class for every angle, which approaches the unit circle as the norm grows
+        ax = figure.add_subplot(projection='polar')
+        dominant = np.max(y, axis=0) if job['classes'] is None else np.max(y[list(classes)], axis=0)
+        for radius, curve in zip(x[0], dominant):
+            ax.plot(x[1], curve, label='R = '+str(radius))
+        ax.legend(loc='lower left', bbox_to_anchor=(1.0, 0.0))
+    figure.savefig(path, format=job['format'], bbox_inches='tight')
+    return path
+
+def renderFigures(jobs, output='.', processes=None, force=False):
+    '''
+    Renders the figures of a list of jobs in parallel, skipping the jobs whose figure exists and whose settings and
+    feature space are unchanged since it was rendered. The hashes of the rendered jobs are kept in a cache file of the
+    output directory, which is written even if some jobs fail, so that the figures rendered before are not rendered again.
+
+    Parameters
+    ----------
+
+    jobs: [dict]
+        The jobs, e.g. from loadManifest(), each with a name and the settings of DEFAULTS
+
+    output: str
+        The directory of the figures
+
+    processes: int
+        The number of processes, or None for all the cpus
+
+    force: Bool
+        If true all the figures are rendered again
+
+    Returns
+    -------
+
+        The paths of the rendered figures and the paths of the skipped, unchanged figures as lists
+    '''
+    os.makedirs(output, exist_ok=True)
+    cachePath = os.path.join(output, CACHE)
+    cache = dict()
+    if os.path.exists(cachePath) and not force:
+        with open(cachePath) as file:
+            cache = json.load(file)
+
+    tasks, keys, skipped = list(), dict(), list()
+    for job in jobs:
+        job = dict(DEFAULTS, **job)
+        _checkJob(job)
+        a, weights = _jobSpace(job)
+        path = os.path.join(output, job['name']+'.'+job['format'])
+        if path in keys:
+            raise ValueError('Duplicate job '+job['name']+'.'+job['format'])
+        keys[path] = _jobKey(job, a, weights)
+        if cache.get(os.path.basename(path)) == keys[path] and os.path.exists(path):
+            skipped.append(path)
+        else:
+            tasks.append((_renderJob, job, a, weights, path))
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    rendered, errors = list(), list()
+
+    def record(path):
+        rendered.append(path)
+        cache[os.path.basename(path)] = keys[path]
+
+    # Every figure is recorded in the cache as soon as it is rendered, and the first failure is raised after the rest
+    try:
+        if processes <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                try:
+                    record(task[0](*task[1:]))
+                except Exception as error:
+                    errors.append(error)
+        else:
+            with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as executor:
+                for future in as_completed([executor.submit(*task) for task in tasks]):
+                    try:
+                        record(future.result())
+                    except Exception as error:
+                        errors.append(error)
+    finally:
+        with open(cachePath, 'w') as file:
+            json.dump(cache, file, indent=1, sort_keys=True)
+    if errors:
+        raise errors[0]
+    order = {task[-1]: i for i, task in enumerate(tasks)}
+    return sorted(rendered, key=order.get), skipped
+
+def main(arguments=None):
+    '''
+    Renders the figures of a manifest from the command line, i.e. python -m DeepFeatureSpace manifest.json
+    '''
+    parser = argparse.ArgumentParser(description='Renders the figures of a manifest of jobs without the GUI')
+    parser.add_argument('manifest', help='the json manifest of the jobs')
+    parser.add_argument('--output', help='the directory of the figures, overriding the manifest')
+    parser.add_argument('--processes', type=int, help='the number of processes')
+    parser.add_argument('--force', action='store_true', help='render the unchanged figures again')
+    arguments = parser.parse_args(arguments)
+    jobs, output = loadManifest(arguments.manifest)
+    rendered, skipped = renderFigures(jobs, arguments.output or output, arguments.processes, arguments.force)
+    print('Rendered '+str(len(rendered))+' figures, skipped '+str(len(skipped))+' unchanged')
@@ -0,0 +1,223 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+from .WeightIndex import WeightIndex
+from .SoftmaxGeometry import planeBasis, planeOutputs
+from .DualNumbers import variable
+
+
+class SoftmaxEngine:
+    '''
+    Keeps the softmax outputs, and their derivatives, of the classes while the feature vector is scaled and rotated on
+    the plane of rotation, and recomputes only what depends on an edited entry of the feature space:
+        - the feature vector, or the weight of the nearest class, define the plane, so that everything is recomputed
+        - the weight of any other class changes only its own projection and output rows, and the softmax sums
+        e.g.    engine = SoftmaxEngine(a, weights, norms, thetas)
+                engine._setWeight(2, 0, 0.5)
+                S, dS = engine._scale()
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    norms: numpy.ndarray
+        The scaling factors of the feature vector, of shape (n,)
+
+    thetas: numpy.ndarray
+        The rotation angles of the feature vector, of shape (m,)
+    '''
+    def __init__(self, a, weights, norms, thetas):
+
+        self.a = np.array(a, dtype=float)
+        self.index = WeightIndex(weights)
+        self.weights = self.index.weights
+        self.parameters = {'scale': {'norms': variable(norms)}, 'rotate': {'thetas': variable(thetas)}}
+        self.recomputations = {'plane': 0, 'rows': 0}
+        self._setFeature(self.a)
+
+    def _setFeature(self, a):
+        '''
+        Replaces the feature vector, which invalidates the plane of rotation
+        '''
+        self.a = np.array(a, dtype=float)
+        self.cosines = self.index._cosines(self.a)
+        self._plane = None
+        self._stale = set()
+        pass
+
+    def _setWeight(self, i, j, weight):
+        '''
+        Replaces the entry j of the weight of class i, see _setWeights()
+        '''
+        row = self.weights[i].copy()
+        row[j] = weight
+        self._setWeights(i, row)
+        pass
+
+    def _setWeights(self, i, weight):
+        '''
+        Replaces the weight vector of class i. The plane is invalidated only if the class is, or becomes, the nearest
+        class to the feature vector, otherwise only the row of the class is marked for recomputation.
+
+        Parameters
+        ----------
+
+        i: int
+            The index of the class
+
+        weight: numpy.ndarray
+            The new weight vector of shape (d,)
+
+        Returns
+        -------
+
+            None
+        '''
+        self.index._updateRow(i, weight)
+        self.cosines[i] = np.clip(self.index.normalized[i] @ self.a/np.linalg.norm(self.a), -1, 1)
+        if self._plane is not None and (i == self.ind or int(np.argmax(self.cosines)) != self.ind):
+            self._plane = None
+        if self._plane is not None:
+            self._stale.add(i)
+        pass
+
+    def _update(self):
+        '''
+        Brings the cached outputs up to date with the edits since the last call
+        '''
+        if self._plane is None:
+            self._recompute()
+        elif self._stale:
+            rows = np.array(sorted(self._stale))
+            c1, c2 = self.weights[rows] @ self._plane[1], self.weights[rows] @ self._plane[2]
+            self.c1[rows], self.c2[rows] = c1, c2
+            for mode, cache in self._caches.items():
+                self._updateRows(cache, rows, planeOutputs(self._plane[0], c1, c2, **self.parameters[mode]))
+            self.recomputations['rows'] += len(rows)
+        self._stale = set()
+        pass
+
+    def _recompute(self):
+        '''
+        Recomputes the plane of rotation, the projections of all the classes and the softmax sums
+        '''
+        # The same nearest class as planeOfRotation(), since the angle decreases with the cosine
+        self.ind = int(np.argmax(self.cosines))
+        self._plane = planeBasis(self.a, self.weights, self.ind)
+        self.c1, self.c2 = self.weights @ self._plane[1], self.weights @ self._plane[2]
+        self._caches = dict()
+        for mode, parameters in self.parameters.items():
+            self._caches[mode] = self._cache(planeOutputs(self._plane[0], self.c1, self.c2, **parameters))
+        self.recomputations['plane'] += 1
+        pass
+
+    def _cache(self, outputs):
+        '''
+        Caches the outputs and their derivatives, the exponentials of the outputs shifted by their maximum along the
+        classes, and the sums of the exponentials, plain and weighted by the derivatives
+        '''
+        z, dz = np.array(outputs.value), np.array(outputs.tangent[...,0])
+        shift = np.max(z, axis=0)
+        e = np.exp(z - shift)
+        return {'z': z, 'dz': dz, 'shift': shift, 'e': e, 'sums': np.sum(e, axis=0), 'wsums': np.sum(e*dz, axis=0)}
+
+    def _updateRows(self, cache, rows, outputs):
+        '''
+        Replaces the output rows of some classes and updates the softmax sums by their differences. The sums are
+        recomputed instead if the new outputs exceed the shift, or if the replaced rows held most of the sums, where the
+        differences would lose precision.
+        '''
+        z, dz = outputs.value, outputs.tangent[...,0]
+        old, oldWeighted = np.sum(cache['e'][rows], axis=0), np.sum(cache['e'][rows]*cache['dz'][rows], axis=0)
+        if np.any(z > cache['shift']) or np.any(old > 0.5*cache['sums']):
+            cache['z'][rows], cache['dz'][rows] = z, dz
+            cache['shift'] = np.max(cache['z'], axis=0)
+            cache['e'] = np.exp(cache['z'] - cache['shift'])
+            cache['sums'], cache['wsums'] = np.sum(cache['e'], axis=0), np.sum(cache['e']*cache['dz'], axis=0)
+            return
+        e = np.exp(z - cache['shift'])
+        cache['z'][rows], cache['dz'][rows], cache['e'][rows] = z, dz, e
+        cache['sums'] += np.sum(e, axis=0) - old
+        cache['wsums'] += np.sum(e*dz, axis=0) - oldWeighted
+        pass
+
+    def _softmax(self, mode):
+        '''
+        Normalizes the cached exponentials of a mode, i.e. S_i = e_i/sum_c e_c and dS_i = S_i*(dz_i - sum_c S_c*dz_c)
+        '''
+        self._update()
+        cache = self._caches[mode]
+        s = cache['e']/cache['sums']
+        return s, s*(cache['dz'] - cache['wsums']/cache['sums'])
+
+    def _outputs(self, mode):
+        '''
+        Returns the outputs of the classes of a mode, 'scale' or 'rotate', and their derivatives, before the softmax
+        '''
+        self._update()
+        cache = self._caches[mode]
+        return cache['z'], cache['dz']
+
+    def _surface(self, norms, thetas):
+        '''
+        Calculates the outputs of the classes over the grid of the scaling factors and the rotation angles of the
+        feature vector, on the cached plane of rotation
+
+        Parameters
+        ----------
+
+        norms: numpy.ndarray
+            The scaling factors of the feature vector, of shape (n,)
+
+        thetas: numpy.ndarray
+            The rotation angles of the feature vector, of shape (m,)
+
+        Returns
+        -------
+
+            The outputs as a numpy array of shape (classes, n, m)
+        '''
+        self._update()
+        norms, thetas = np.asarray(norms, dtype=float), np.asarray(thetas, dtype=float)
+        return planeOutputs(self._plane[0], self.c1, self.c2, norms[:,None], thetas[None,:])
+
+    def _scale(self):
+        '''
+        Returns the softmax outputs of the classes while the feature vector is scaled, and their derivatives with respect
+        to the scaling factor, as numpy arrays of shape (classes, n)
+        '''
+        return self._softmax('scale')
+
+    def _rotate(self):
+        '''
+        Returns the softmax outputs of the classes while the feature vector is rotated, and their derivatives with respect
+        to the angle, as numpy arrays of shape (classes, m)
+        '''
+        return self._softmax('rotate')
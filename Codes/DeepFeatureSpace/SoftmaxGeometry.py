@@ -0,0 +1,318 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+from .CliffordSpace import Cl
+from .CliffordNumbers import ClNumber
+from .CliffordBlades import ClBlade
+from .WeightIndex import WeightIndex
+from .DualNumbers import Dual, value, variable
+
+
+def softmax(x, axis=0):
+    '''
+    Calculates the softmax function of the outputs along the classes axis
+
+    Parameters
+    ----------
+
+    x: numpy.ndarray or Dual
+        The outputs of the classes, e.g. of shape (classes, n)
+
+    axis: int
+        The axis of the classes
+
+    Returns
+    -------
+
+        The softmax outputs with the same shape and type as x
+    '''
+    if not isinstance(x, Dual):
+        x = np.asarray(x, dtype=float)
+    e = np.exp(x - np.max(value(x), axis=axis, keepdims=True))
+    return e/np.sum(e, axis=axis, keepdims=True)
+
+def softmaxDerivative(x, dx, axis=0):
+    '''
+    Calculates the derivative of the softmax outputs of every class, given the derivatives of the outputs
+    with respect to the same variable, i.e. dS_i = S_i*(dx_i - sum_c S_c*dx_c)
+
+    Parameters
+    ----------
+
+    x: numpy.ndarray
+        The outputs of the classes, e.g. of shape (classes, n)
+
+    dx: numpy.ndarray
+        The derivatives of the outputs, with the same shape
+
+    axis: int
+        The axis of the classes
+
+    Returns
+    -------
+
+        The derivatives of the softmax outputs as a numpy array of the same shape
+    '''
+    s = softmax(x, axis)
+    return s*(dx - np.sum(s*dx, axis=axis, keepdims=True))
+
+def softmaxJacobian(x, axis=0):
+    '''
+    Calculates the Jacobian of the softmax outputs with respect to the outputs of all classes at once,
+    i.e. J_ij = S_i*(delta_ij - S_j)
+
+    Parameters
+    ----------
+
+    x: numpy.ndarray
+        The outputs of the classes, e.g. of shape (classes, n)
+
+    axis: int
+        The axis of the classes
+
+    Returns
+    -------
+
+        The Jacobian as a numpy array of shape (classes, classes, n), with the rest of the axes of x following the two classes axes
+    '''
+    s = np.moveaxis(softmax(value(x), axis), axis, 0)
+    return (np.eye(len(s)).reshape((len(s), len(s))+(1,)*(s.ndim-1)) - s[None])*s[:,None]
+
+def angleBetVectors(vector1, vector2):
+    '''
+    Calculates the angle between two vectors, or between each row of vector1 and vector2
+    '''
+    vector1, vector2 = np.asarray(vector1, dtype=float), np.asarray(vector2, dtype=float)
+    arc = (vector1 @ vector2)/(np.linalg.norm(vector1, axis=-1)*np.linalg.norm(vector2))
+    return np.arccos(np.clip(arc, -1, 1))
+
+def planeOfRotation(a, weights, index=None):
+    '''
+    Finds the class whose weight forms the smallest angle with the feature vector and the unit plane
+    spanned by the two vectors
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    index: WeightIndex
+        A prebuilt index over the weights
+
+    Returns
+    -------
+
+        The index of the nearest class as type of int and the plane as type of ClBlade, which is expanded by
+        rotateNd() and by the products of ClNumber objects
+    '''
+    if index is None:
+        index = WeightIndex(weights)
+    ind = int(index._nearest(a)[0][0])
+    plane = ClBlade(Cl(len(a)), [a, weights[ind]])._normalize()
+    return ind, plane
+
+def rotateNd(nVector, rotationPlane, rotationTheta=0):
+    '''
+    Rotates a Clifford number on a unit plane by the rotor exp(-theta/2 B)
+
+    Parameters
+    ----------
+
+    nVector: ClNumber
+        The rotated Clifford number
+
+    rotationPlane: ClNumber or ClBlade
+        The unit plane of rotation, e.g. as returned by planeOfRotation()
+
+    rotationTheta: float
+        The angle of rotation
+
+    Returns
+    -------
+
+        The rotated Clifford number as type of ClNumber
+    '''
+    if isinstance(rotationPlane, ClBlade):
+        rotationPlane = rotationPlane._transform2ClNumber()
+    cl = Cl(nVector.dimensions)
+    rotor  = ClNumber(cl,{'': np.cos(rotationTheta/2)}) - np.sin(rotationTheta/2)*rotationPlane
+    rotorS = ClNumber(cl,{'': np.cos(rotationTheta/2)}) + np.sin(rotationTheta/2)*rotationPlane
+    return rotor*nVector*rotorS
+
+def projectWeights(weights, plane):
+    '''
+    Projects every class weight onto the plane of rotation with a single product
+
+    Returns
+    -------
+
+        The projected weights as a numpy array of shape (classes, d)
+    '''
+    basis = plane._basis()
+    return (np.asarray(weights, dtype=float) @ basis) @ basis.T
+
+def planeBasis(a, weights, ind):
+    '''
+    Calculates the orthonormal basis (u1, u2) of the plane of rotation, where u1 is along the feature vector and u2 points
+    towards the weight of the nearest class, with the same operations as planeCoordinates()
+
+    Returns
+    -------
+
+        The norm of the feature vector and the two basis vectors of shape (d,)
+    '''
+    norm = np.sqrt(a @ a)
+    u1 = a/norm
+    wj = weights[ind]
+    v = wj - (wj @ u1)*u1
+    return norm, u1, v/np.sqrt(v @ v)
+
+def planeCoordinates(a, weights, ind):
+    '''
+    Calculates the coordinates of every class weight on the plane of rotation, in the orthonormal basis (u1, u2) where
+    u1 is along the feature vector and u2 points towards the weight of the nearest class. Only products, sums and
+    square roots are used, so that a, weights, or both may be Dual numbers.
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray or Dual
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray or Dual
+        The weight matrix of shape (classes, d)
+
+    ind: int
+        The index of the nearest class, see planeOfRotation()
+
+    Returns
+    -------
+
+        The norm of the feature vector and the two coordinates of the projected weights, of shape (classes,)
+    '''
+    norm, u1, u2 = planeBasis(a, weights, ind)
+    return norm, weights @ u1, weights @ u2
+
+def outputs(a, weights, ind, norms=1.0, thetas=0.0):
+    '''
+    Calculates the outputs of the classes when the feature vector is scaled by norms and rotated by thetas on the plane
+    of rotation towards the nearest class, i.e. z_i = R*|a|*|p_i|*cos(theta - phi_i) with p_i the projected weight at
+    angle phi_i from a. Any of the arguments may be a Dual number, e.g. from DualNumbers.variable(), giving the
+    derivatives of the outputs with respect to it in the same pass.
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray or Dual
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray or Dual
+        The weight matrix of shape (classes, d)
+
+    ind: int
+        The index of the nearest class, see planeOfRotation()
+
+    norms: float, numpy.ndarray or Dual
+        The scaling factors of the feature vector
+
+    thetas: float, numpy.ndarray or Dual
+        The rotation angles of the feature vector, broadcastable with norms
+
+    Returns
+    -------
+
+        The outputs as a numpy array, or Dual, of shape (classes,)+shape of norms and thetas
+    '''
+    return planeOutputs(*planeCoordinates(a, weights, ind), norms, thetas)
+
+def planeOutputs(norm, c1, c2, norms=1.0, thetas=0.0):
+    '''
+    Calculates the outputs of outputs() from the norm of the feature vector and the plane coordinates of the weights,
+    e.g. for a subset of the classes
+
+    Returns
+    -------
+
+        The outputs as a numpy array, or Dual, of shape (len(c1),)+shape of norms and thetas
+    '''
+    shape = np.broadcast_shapes(np.shape(value(norms)), np.shape(value(thetas)))
+    expand = (slice(None),)+(None,)*len(shape)
+    return norm*norms*(c1[expand]*np.cos(thetas) + c2[expand]*np.sin(thetas))
+
+def scaleOutputs(a, weights, norms, ind):
+    '''
+    Calculates the outputs of the classes while the feature vector is scaled
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    norms: numpy.ndarray
+        The scaling factors of the feature vector, of shape (n,)
+
+    ind: int
+        The index of the nearest class, see planeOfRotation()
+
+    Returns
+    -------
+
+        The outputs as a Dual number of shape (classes, n), with their derivatives with respect to the scaling factor
+    '''
+    return outputs(a, weights, ind, norms=variable(norms))
+
+def rotateOutputs(a, weights, thetas, ind):
+    '''
+    Calculates the outputs of the classes while the feature vector is rotated on the plane of rotation
+
+    Parameters
+    ----------
+
+    a: numpy.ndarray
+        The feature vector of shape (d,)
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    thetas: numpy.ndarray
+        The rotation angles of the feature vector, of shape (n,)
+
+    ind: int
+        The index of the nearest class, see planeOfRotation()
+
+    Returns
+    -------
+
+        The outputs as a Dual number of shape (classes, n), with their derivatives with respect to the angle
+    '''
+    return outputs(a, weights, ind, thetas=variable(thetas))
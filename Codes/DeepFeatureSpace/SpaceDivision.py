@@ -0,0 +1,245 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import os
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+ACTIVATIONS = ('linear', 'relu')
+
+
+def _labelType(classes):
+    '''
+    Selects the smallest integer type able to hold the label of every class
+    '''
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if classes <= np.iinfo(dtype).max+1:
+            return dtype
+    return np.int64
+
+def _classify(points, weights, activation, basis=None):
+    '''
+    Classifies a chunk of points with a single product against the weight matrix.
+
+    Parameters
+    ----------
+
+    points: numpy.ndarray
+        The points of the chunk as an array of shape (n, k)
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+
+    activation: str
+        The activation applied on the feature vectors, one of ACTIVATIONS
+
+    basis: numpy.ndarray
+        An orthonormal basis of shape (d, k) embedding the points in the d-D feature space,
+        or None if the points already lie in the feature space
+
+    Returns
+    -------
+
+        The index of the winning class for every point as a numpy array of shape (n,), of the type of _labelType()
+    '''
+    if basis is not None:
+        if activation == 'linear':
+            # The embedding is folded into the weights, so the chunk needs a single (n, k) product
+            weights = weights @ basis
+        else:
+            points = points @ basis.T
+    if activation == 'relu':
+        points = np.maximum(points, 0)
+    return np.argmax(points @ weights.T, axis=1).astype(_labelType(len(weights)))
+
+def _classifyGridChunk(start, stop, resolution, bounds, dimensions, weights, activation, basis):
+    '''
+    Creates the points of the flat grid indexes [start, stop) and classifies them
+    '''
+    index = np.arange(start, stop)
+    points = np.empty((stop-start, dimensions))
+    for axis in reversed(range(dimensions)):
+        index, points[:,axis] = np.divmod(index, resolution)
+    points = bounds[0] + points*(bounds[1]-bounds[0])/(resolution-1)
+    return start, _classify(points, weights, activation, basis)
+
+def _classifyPointsChunk(start, points, weights, activation, basis):
+
+    return start, _classify(points, weights, activation, basis)
+
+def _run(tasks, labels, processes):
+    '''
+    Executes the chunk tasks, in parallel if more than one process is requested, and stores
+    the returned labels in place. At most 2*processes tasks are in flight, and each result is
+    released once it is stored.
+    '''
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(tasks) <= 1:
+        results = (task[0](*task[1:]) for task in tasks)
+        for start, chunk in results:
+            labels[start:start+len(chunk)] = chunk
+        return labels
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        tasks, pending = iter(tasks), deque()
+        while True:
+            for task in tasks:
+                pending.append(executor.submit(*task))
+                if len(pending) >= 2*processes:
+                    break
+            if not pending:
+                break
+            start, chunk = pending.popleft().result()
+            labels[start:start+len(chunk)] = chunk
+    return labels
+
+def _checkActivation(activation):
+
+    if activation not in ACTIVATIONS:
+        raise ValueError('Unknown activation '+str(activation)+', expected one of '+str(ACTIVATIONS))
+
+def randomSlice(dimensions, seed=None, size=3):
+    '''
+    Draws a random 3-D slice of a higher dimensional feature space
+
+    Parameters
+    ----------
+
+    dimensions: int
+        The dimensions of the feature space
+
+    seed: int
+        The seed of the random generator
+
+    size: int
+        The dimensions of the slice
+
+    Returns
+    -------
+
+        An orthonormal basis of the slice as a numpy array of shape (dimensions, size)
+    '''
+    rng = np.random.default_rng(seed)
+    basis, _ = np.linalg.qr(rng.standard_normal((int(dimensions), int(size))))
+    return basis
+
+def gridAxis(resolution, bounds=(-1.0, 1.0)):
+    '''
+    Returns the coordinates of the grid along each axis, e.g. for plotting the labels of classifyGrid()
+    '''
+    return np.linspace(bounds[0], bounds[1], int(resolution))
+
+def classifyPoints(points, weights, activation='linear', basis=None, chunkSize=2**20, processes=None):
+    '''
+    Classifies a point cloud according to the class with the largest output.
+
+    Parameters
+    ----------
+
+    points: numpy.ndarray
+        The point cloud as an array of shape (n, d), or of shape (n, k) when a basis is given
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d), e.g. as loaded by FeatureSpace.loadSpace()
+
+    activation: str
+        The activation applied on the feature vectors, 'linear' or 'relu'
+
+    basis: numpy.ndarray
+        An orthonormal basis of shape (d, k) embedding the points in the feature space, e.g. from randomSlice()
+
+    chunkSize: int
+        The number of points classified by a single matrix product
+
+    processes: int
+        The number of worker processes, defaults to the number of cores
+
+    Returns
+    -------
+
+        The index of the winning class for every point as a numpy array of shape (n,)
+    '''
+    _checkActivation(activation)
+    points, weights = np.asarray(points, dtype=float), np.asarray(weights, dtype=float)
+    labels = np.empty(len(points), dtype=_labelType(len(weights)))
+    chunkSize = int(chunkSize)
+    tasks = [(_classifyPointsChunk, start, points[start:start+chunkSize], weights, activation, basis)
+             for start in range(0, len(points), chunkSize)]
+    return _run(tasks, labels, processes)
+
+def classifyGrid(weights, resolution=128, bounds=(-1.0, 1.0), activation='linear', basis=None, chunkSize=2**20, processes=None):
+    '''
+    Classifies a dense grid of a 2-D or 3-D feature space, or of a slice of a higher dimensional one, according
+    to the class with the largest output. The grid points are created inside the workers chunk by chunk, so that
+    the calling process keeps the labels, e.g. 128 MB for a 512^3 grid of up to 256 classes, and the labels of at
+    most 2*processes chunks in flight.
+
+    Parameters
+    ----------
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d), e.g. as loaded by FeatureSpace.loadSpace()
+
+    resolution: int
+        The number of grid points along each axis, at least 2
+
+    bounds: (float, float)
+        The lower and upper limit of the grid along each axis
+
+    activation: str
+        The activation applied on the feature vectors, 'linear' or 'relu'
+
+    basis: numpy.ndarray
+        An orthonormal basis of shape (d, k) of the classified slice, e.g. from randomSlice(). It is required if d > 3
+
+    chunkSize: int
+        The number of grid points classified by a single matrix product
+
+    processes: int
+        The number of worker processes, defaults to the number of cores
+
+    Returns
+    -------
+
+        The index of the winning class for every grid point as a numpy array of shape (resolution,)*k
+    '''
+    _checkActivation(activation)
+    weights = np.asarray(weights, dtype=float)
+    if basis is None:
+        dimensions = weights.shape[1]
+        if dimensions not in (2, 3):
+            raise ValueError('A slice basis is required for '+str(dimensions)+' dimensions')
+    else:
+        basis = np.asarray(basis, dtype=float)
+        dimensions = basis.shape[1]
+    resolution, chunkSize = int(resolution), int(chunkSize)
+    if resolution < 2:
+        raise ValueError('The resolution of the grid must be at least 2, got '+str(resolution))
+    total = resolution**dimensions
+    labels = np.empty(total, dtype=_labelType(len(weights)))
+    tasks = [(_classifyGridChunk, start, min(start+chunkSize, total), resolution, bounds, dimensions, weights, activation, basis)
+             for start in range(0, total, chunkSize)]
+    return _run(tasks, labels, processes).reshape((resolution,)*dimensions)
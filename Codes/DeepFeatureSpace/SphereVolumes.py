@@ -0,0 +1,187 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import os, time
+import numpy as np
+from collections import deque
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+
+
+class VolumeEstimate:
+    '''
+    The Monte Carlo estimate of the fraction of the hypersphere claimed by each class
+
+    Parameters
+    ----------
+
+    counts: numpy.ndarray
+        The number of samples assigned to each class
+
+    elapsed: float
+        The wall time of the estimation in seconds
+
+    confidence: float
+        The confidence level of the reported intervals
+
+    converged: Bool
+        True if the target interval width was reached before the sample limit
+    '''
+    def __init__(self, counts, elapsed, confidence, converged):
+
+        self.counts = counts
+        self.samples = int(np.sum(counts))
+        self.fractions = counts/self.samples
+        self.halfWidths = _wilsonHalfWidths(counts, self.samples, confidence)
+        self.confidence = confidence
+        self.converged = converged
+        self.elapsed = elapsed
+        self.samplesPerSecond = self.samples/elapsed if elapsed > 0 else float('inf')
+
+    def __repr__(self):
+
+        return ('VolumeEstimate(samples='+str(self.samples)+', fractions='+str(np.round(self.fractions, 6).tolist())
+                +', halfWidths='+str(np.round(self.halfWidths, 6).tolist())+', samplesPerSecond='+str(int(self.samplesPerSecond))+')')
+
+
+def _wilsonHalfWidths(counts, samples, confidence):
+    '''
+    Calculates the half width of the Wilson score interval of every class fraction
+    '''
+    z = NormalDist().inv_cdf(0.5+confidence/2)
+    p = counts/samples
+    return z/(1+z**2/samples)*np.sqrt(p*(1-p)/samples+z**2/(4*samples**2))
+
+def _countBatches(weights, activation, seedSequence, batchSize, samples):
+    '''
+    Draws uniform directions in batches from an independent random stream and counts the winning class of each.
+    Directions are drawn from an isotropic normal distribution without normalization, since the class regions
+    are cones and the winning class does not depend on the norm of the feature vector. The counts of every batch
+    are returned separately, as an array of shape (batches, classes), with the remainder of the samples in the last batch.
+    '''
+    rng = np.random.default_rng(seedSequence)
+    sizes = [batchSize]*(samples//batchSize) + ([samples%batchSize] if samples%batchSize else [])
+    counts = np.zeros((len(sizes), len(weights)), dtype=np.int64)
+    for batch, size in enumerate(sizes):
+        directions = rng.standard_normal((size, weights.shape[1]), dtype=weights.dtype)
+        if activation == 'relu':
+            np.maximum(directions, 0, out=directions)
+        counts[batch] = np.bincount(np.argmax(directions @ weights.T, axis=1), minlength=len(weights))
+    return counts
+
+def estimateVolumes(weights, activation='linear', width=1e-3, confidence=0.95, seed=None, batchSize=None, batchesPerTask=16,
+                    processes=None, maxSamples=10**10, dtype=np.float32):
+    '''
+    Estimates the fraction of the unit hypersphere that each class claims, i.e. the directions whose largest output
+    belongs to that class. Since the regions are cones, the same fractions hold for any norm shell.
+    Samples are drawn in tasks of batchesPerTask batches, each with its own child stream of the seed, and counts are
+    accumulated batch by batch in task order until every confidence interval is narrower than width, with the last task
+    shortened so that at most maxSamples are drawn. No more than z^2/width^2 samples are drawn either, since the widest
+    Wilson interval, of a fraction of 0.5, is then narrower than width. The estimate therefore depends only on the seed and the batch
+    sizes, not on the number of processes or their scheduling.
+
+    Parameters
+    ----------
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d), e.g. as loaded by FeatureSpace.loadSpace()
+
+    activation: str
+        The activation applied on the feature vectors, 'linear' or 'relu'
+
+    width: float
+        The target full width of the confidence interval of every class fraction
+
+    confidence: float
+        The confidence level of the intervals
+
+    seed: int
+        The seed of the random streams
+
+    batchSize: int
+        The number of directions classified by a single matrix product, by default at most 2^16 directions or 16 MB of samples
+
+    batchesPerTask: int
+        The number of batches drawn by each task of a worker
+
+    processes: int
+        The number of worker processes, defaults to the number of cores
+
+    maxSamples: int
+        The largest number of samples, after which the estimation stops even if the target width is not reached
+
+    dtype: numpy.dtype
+        The floating point type of the sampled directions
+
+    Returns
+    -------
+
+        The estimate as an object of type VolumeEstimate
+    '''
+    if activation not in ('linear', 'relu'):
+        raise ValueError('Unknown activation '+str(activation))
+    weights = np.asarray(weights, dtype=dtype)
+    if batchSize is None:
+        batchSize = max(256, min(2**16, 2**22//weights.shape[1]))
+    if processes is None:
+        processes = os.cpu_count() or 1
+    z = NormalDist().inv_cdf(0.5+confidence/2)
+    taskSamples, maxSamples = batchSize*batchesPerTask, int(min(maxSamples, np.ceil(z**2/width**2)))
+    root = np.random.SeedSequence(seed)
+    counts = np.zeros(len(weights), dtype=np.int64)
+    start = time.perf_counter()
+
+    def converged():
+        samples = counts.sum()
+        return samples > 0 and 2*np.max(_wilsonHalfWidths(counts, samples, confidence)) <= width
+
+    def accumulate(batchCounts):
+        # The convergence is checked after every batch, so that the estimation stops within a batch of the target
+        for batch in batchCounts:
+            np.add(counts, batch, out=counts)
+            if converged():
+                return True
+        return counts.sum() >= maxSamples
+
+    submitted = 0
+    if processes <= 1:
+        while submitted < maxSamples:
+            samples = min(taskSamples, maxSamples-submitted)
+            submitted += samples
+            if accumulate(_countBatches(weights, activation, root.spawn(1)[0], batchSize, samples)):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < 2*processes and submitted < maxSamples:
+                    samples = min(taskSamples, maxSamples-submitted)
+                    submitted += samples
+                    pending.append(executor.submit(_countBatches, weights, activation, root.spawn(1)[0], batchSize, samples))
+                if not pending or accumulate(pending.popleft().result()):
+                    break
+            for future in pending:
+                future.cancel()
+
+    return VolumeEstimate(counts, time.perf_counter()-start, confidence, bool(converged()))
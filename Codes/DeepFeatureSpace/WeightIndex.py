@@ -0,0 +1,245 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+import numpy as np
+
+
+class WeightIndex:
+    '''
+    An index over the weight vectors of the classes, which keeps their norms and the row-normalized
+    weight matrix so that angle queries need a single matrix product.
+        e.g.    index = WeightIndex(weights)
+                index._nearest(features) := the class with the smallest angle to each feature vector
+
+    Parameters
+    ----------
+
+    weights: numpy.ndarray
+        The weight matrix of shape (classes, d)
+    '''
+    def __init__(self, weights):
+
+        self.weights = np.array(weights, dtype=float)
+        self.norms = np.linalg.norm(self.weights, axis=1)
+        self.normalized = self.weights/self.norms[:,None]
+        self._gram = None
+        self._planes = None
+        self._tables = None
+
+    def _updateRow(self, i, weight):
+        '''
+        Replaces the weight vector of a single class, updating its norm, its normalized row and its row and column of the
+        cached angles in O(classes*d). The random projection buckets are rehashed on the next approximate query, with the
+        hyperplanes and settings of _buildBuckets().
+
+        Parameters
+        ----------
+
+        i: int
+            The index of the class
+
+        weight: numpy.ndarray
+            The new weight vector of shape (d,)
+
+        Returns
+        -------
+
+            None
+        '''
+        self.weights[i] = weight
+        self.norms[i] = np.linalg.norm(self.weights[i])
+        self.normalized[i] = self.weights[i]/self.norms[i]
+        if self._gram is not None:
+            self._gram[i] = self._gram[:,i] = np.arccos(np.clip(self.normalized @ self.normalized[i], -1, 1))
+        self._tables = None
+        pass
+
+    def _cosines(self, features):
+        '''
+        Calculates the cosine of the angle between each feature vector and each class weight
+
+        Parameters
+        ----------
+
+        features: numpy.ndarray
+            The feature vectors as an array of shape (n, d) or a single vector of shape (d,)
+
+        Returns
+        -------
+
+            The cosines as a numpy array of shape (n, classes), or (classes,) for a single vector
+        '''
+        features = np.asarray(features, dtype=float)
+        norms = np.linalg.norm(features, axis=-1)
+        return np.clip((features @ self.normalized.T)/np.expand_dims(norms, -1), -1, 1)
+
+    def _angles(self, features):
+        '''
+        Calculates the angle between each feature vector and each class weight, with the same shapes as _cosines()
+        '''
+        return np.arccos(self._cosines(features))
+
+    def _nearest(self, features, k=1, approximate=False):
+        '''
+        Finds the classes whose weights form the smallest angles with each feature vector
+
+        Parameters
+        ----------
+
+        features: numpy.ndarray
+            The feature vectors as an array of shape (n, d) or a single vector of shape (d,)
+
+        k: int
+            The number of returned classes for each feature vector
+
+        approximate: Bool
+            If true only the classes sharing a random projection bucket with the feature vector are
+            ranked, see _buildBuckets()
+
+        Returns
+        -------
+
+            The indexes and the angles of the k nearest classes, sorted by angle, as numpy arrays of
+            shape (n, k), or (k,) for a single vector. In approximate mode missing candidates are
+            returned with index -1 and angle inf
+        '''
+        features = np.asarray(features, dtype=float)
+        single = features.ndim == 1
+        features = np.atleast_2d(features)
+        if approximate:
+            indexes, angles = self._nearestApproximate(features, k)
+        else:
+            indexes, angles = self._topK(self._angles(features), k)
+        if single:
+            return indexes[0], angles[0]
+        return indexes, angles
+
+    def _topK(self, angles, k):
+
+        k = min(k, angles.shape[1])
+        if k == 1:
+            candidates = np.argmin(angles, axis=1)[:,None]
+        elif k < angles.shape[1]:
+            candidates = np.argpartition(angles, k-1, axis=1)[:,:k]
+        else:
+            candidates = np.broadcast_to(np.arange(angles.shape[1]), angles.shape)
+        candidateAngles = np.take_along_axis(angles, candidates, axis=1)
+        order = np.argsort(candidateAngles, axis=1)
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidateAngles, order, axis=1)
+
+    def _buildBuckets(self, bits=12, tables=8, seed=None):
+        '''
+        Hashes the class weights into random projection buckets, i.e. by the signs of their products with random
+        hyperplanes, for approximate queries over heads with 10^4-10^5 classes. Two vectors with an angle theta share a
+        bucket of a table with probability (1-theta/pi)^bits.
+
+        Parameters
+        ----------
+
+        bits: int
+            The number of random hyperplanes of each table
+
+        tables: int
+            The number of independent tables, increasing the recall of the queries
+
+        seed: int
+            The seed of the random hyperplanes
+
+        Returns
+        -------
+
+            None
+        '''
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((tables, self.weights.shape[1], bits))
+        self._powers = 2**np.arange(bits)
+        self._hashWeights()
+        pass
+
+    def _hashWeights(self):
+        '''
+        Sorts the class weights into the buckets of every table, keeping the hyperplanes of _buildBuckets()
+        '''
+        self._tables = list()
+        for t in range(len(self._planes)):
+            codes = self._hash(self.normalized, t)
+            order = np.argsort(codes, kind='stable')
+            keys, starts = np.unique(codes[order], return_index=True)
+            self._tables.append((keys, np.append(starts, len(codes)), order))
+        pass
+
+    def _hash(self, vectors, table):
+
+        return (vectors @ self._planes[table] > 0) @ self._powers
+
+    def _nearestApproximate(self, features, k):
+
+        if self._planes is None:
+            self._buildBuckets()
+        elif self._tables is None:
+            self._hashWeights()
+        codes = [self._hash(features, t) for t in range(len(self._tables))]
+        indexes = np.full((len(features), k), -1)
+        angles = np.full((len(features), k), np.inf)
+        for n in range(len(features)):
+            candidates = list()
+            for t, (keys, bounds, order) in enumerate(self._tables):
+                position = np.searchsorted(keys, codes[t][n])
+                if position < len(keys) and keys[position] == codes[t][n]:
+                    candidates.append(order[bounds[position]:bounds[position+1]])
+            if not candidates:
+                continue
+            candidates = np.unique(np.concatenate(candidates))
+            candidateAngles = np.arccos(np.clip(self.normalized[candidates] @ features[n]/np.linalg.norm(features[n]), -1, 1))
+            best, bestAngles = self._topK(candidateAngles[None], k)
+            indexes[n,:best.shape[1]], angles[n,:best.shape[1]] = candidates[best[0]], bestAngles[0]
+        return indexes, angles
+
+    def _gramAngles(self):
+        '''
+        Returns the matrix of the angles between every pair of class weights, calculated once with a single matrix product
+        '''
+        if self._gram is None:
+            self._gram = np.arccos(np.clip(self.normalized @ self.normalized.T, -1, 1))
+        return self._gram
+
+    def _projectedAngles(self, basis):
+        '''
+        Calculates the angles between every pair of class weights after their projection onto a subspace, e.g. the
+        plane of rotation
+
+        Parameters
+        ----------
+
+        basis: numpy.ndarray
+            An orthonormal basis of the subspace as an array of shape (d, k)
+
+        Returns
+        -------
+
+            The angles as a numpy array of shape (classes, classes)
+        '''
+        projected = self.weights @ basis
+        projected = projected/np.linalg.norm(projected, axis=1)[:,None]
+        return np.arccos(np.clip(projected @ projected.T, -1, 1))
@@ -0,0 +1,44 @@
+#  ==================================================================================
+#
+#  Copyright (c) 2020, Ioannis Kansizoglou
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+#  ==================================================================================
+
+'''
+Clifford Algebra and softmax geometry of the deep feature space. The package needs only NumPy; pandas is
+imported when a file is loaded and the GUI lives outside of it, in DeepFeaturesGUI.py.
+'''
+
+from .CliffordSpace import Cl
+from .CliffordNumbers import ClNumber, ClVector
+from .CliffordBlades import ClBlade
+from .CliffordSparse import ClSparse, Truncation
+from .WeightIndex import WeightIndex
+from .FeatureSpace import loadSpace
+from .SpaceDivision import classifyGrid, classifyPoints, randomSlice, gridAxis
+from .SphereVolumes import VolumeEstimate, estimateVolumes
+from .FeatureStatistics import FeatureStatistics, QuantileSketch, readChunks, collectStatistics, loadStatistics
+from .SoftmaxGeometry import (softmax, softmaxDerivative, angleBetVectors, planeOfRotation, rotateNd, projectWeights,
+                              softmaxJacobian, planeBasis, planeCoordinates, outputs, planeOutputs, scaleOutputs,
+                              rotateOutputs)
+from .SoftmaxEngine import SoftmaxEngine
+from .Figures import loadManifest, renderFigures
+from .DualNumbers import Dual, variable, variables, entry, derivative
@@ -1,8 +1,6 @@
 import sys, time
 import numpy as np
-import pandas as pd
-from CliffordSpace import Cl
-from CliffordNumbers import ClNumber, ClVector
+from DeepFeatureSpace import loadSpace, SoftmaxEngine
 
 from matplotlib.backends.qt_compat import QtCore, QtWidgets, QtGui
 from matplotlib.backends.backend_qt5agg import (FigureCanvas, NavigationToolbar2QT as NavigationToolbar)
@@ -27,6 +25,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         #------------------- WINDOW SETTINGS -------------------#
         self.fs=100
         self.num=2000
+        self.engine=None
 
         #------------------- DEFINE FEATURE SPACE -------------------#
         self.boxValues, self.weightNames = list(), list()
@@ -81,16 +80,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         
         self.ClearSpace()
         name,_ = QtWidgets.QFileDialog.getOpenFileName(self, 'Open File','./','All files(*)')
-        df = pd.read_csv(name)
-        self.weights = list()
-        counter = 0
-        for name, value in df.items():
-            if counter==0:
-                self.a = np.array(value)
-            else:
-                self.weights.append(np.array(value))
-            counter += 1
-        self.weights = np.array(self.weights)
+        self.a, self.weights = loadSpace(name)
         self.classes.setValue(len(self.weights))
         self.dimensions.setValue(len(self.weights[0]))
         for i in range(self.classes.value()+1):
@@ -113,7 +103,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
             self.boxValues.append(weightValues)
             self.weightNames.append(weightName)
         self.boxValues = np.array(self.boxValues)
-        
+        self.ConnectSpace()
         pass
 
         
@@ -125,17 +115,34 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.toolbar = NavigationToolbar(self.static_canvas, self)
         self.addToolBar(self.toolbar)
         self._static_ax = self.static_canvas.figure.subplots(2,2)
+        self.lines = dict()
 
         for key, value in self.toPlot.items():
             self._static_ax[int(key[0]),int(key[1])].grid(True)
             self._static_ax[int(key[0]),int(key[1])].set_title(value[2])
+            self.lines[key] = list()
             for i in range(len(value[1])):
-                self._static_ax[int(key[0]),int(key[1])].plot(value[0],value[1][i],label='Class '+str(i+1))
+                self.lines[key] += self._static_ax[int(key[0]),int(key[1])].plot(value[0],value[1][i],label='Class '+str(i+1))
             self._static_ax[int(key[0]),int(key[1])].legend()
         
         self.vLayout.addWidget(self.static_canvas)
         pass
 
+    def UpdatePlot(self):
+
+        self.Scale()
+        self.ScaleDerivative()
+        self.Rotate()
+        self.RotateDerivative()
+        #------- The curves are updated in place instead of recreating the figure -------#
+        for key, value in self.toPlot.items():
+            for i in range(len(value[1])):
+                self.lines[key][i].set_ydata(value[1][i])
+            self._static_ax[int(key[0]),int(key[1])].relim()
+            self._static_ax[int(key[0]),int(key[1])].autoscale_view()
+        self.static_canvas.draw_idle()
+        pass
+
     def CreateSpace(self):
         
         self.ClearSpace()
@@ -156,6 +163,31 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.boxValues = np.array(self.boxValues)
         self.a = np.array([self.boxValues[0,i].value() for i in range(len(self.boxValues[0]))])
         self.weights = np.array([[self.boxValues[i,j].value() for j in range(len(self.boxValues[i]))] for i in range(1,len(self.boxValues))])
+        self.ConnectSpace()
+        pass
+
+    def ConnectSpace(self):
+
+        self.engine = None
+        for i in range(len(self.boxValues)):
+            for j in range(len(self.boxValues[i])):
+                self.boxValues[i,j].valueChanged.connect(lambda value, i=i, j=j: self.EditEntry(i, j, value))
+        pass
+
+    def EditEntry(self, i, j, value):
+
+        if i==0:
+            self.a[j] = value
+        else:
+            self.weights[i-1,j] = value
+        if self.engine is None:
+            return
+        #------- Only the edited class is recomputed, unless the plane of rotation changes -------#
+        if i==0:
+            self.engine._setFeature(self.a)
+        else:
+            self.engine._setWeight(i-1, j, value)
+        self.UpdatePlot()
         pass
 
     def RecreateSpace(self):
@@ -181,7 +213,13 @@ class ApplicationWindow(QtWidgets.QMainWindow):
     def Normalize(self):
 
         self.a = self.a/np.linalg.norm(self.a)
-        [self.boxValues[0,i].setValue(self.a[i]) for i in range(len(self.a))]
+        for i in range(len(self.a)):
+            self.boxValues[0,i].blockSignals(True)
+            self.boxValues[0,i].setValue(self.a[i])
+            self.boxValues[0,i].blockSignals(False)
+        if self.engine is not None:
+            self.engine._setFeature(self.a)
+            self.UpdatePlot()
         #norm = np.linalg.norm(self.weights,axis=1)
         #self.weights =  np.array([np.divide(self.weights[i],norm[i]) for i in range(len(norm))])
         #[[self.boxValues[i+1,j].setValue(self.weights[i,j]) for j in range(len(self.weights[i]))] for i in range(len(self.weights))]
@@ -189,6 +227,9 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
     def Calculate(self):
 
+        norms = np.arange(self.num)/self.fs
+        thetas = np.arange(self.num)/(10*self.fs)*np.pi
+        self.engine = SoftmaxEngine(self.a, self.weights, norms, thetas)
         self.Scale()
         self.progress.setValue(25)
         self.ScaleDerivative()
@@ -202,136 +243,41 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.progress.setValue(100)
         pass
 
-    def Softmax(self,x):
-
-        x = np.array(x)
-        return np.exp(x) / sum(np.exp(x))
-
     def Scale(self):
 
         norms = np.arange(self.num)/self.fs
-        self.ind = self.planeOfRotation()
-        rOutputs = list()
-        
-        for i in range(len(self.weights)):
-            
-            w_Cl = ClVector(Cl(len(self.weights[i])),self.weights[i])
-            proj_w = self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-            rOutputs.append(norms*np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.cos(self.angleBetVectors(proj_w,self.a)))
-        
-        rOutputs = np.array(rOutputs)
-        rOutputs = np.array([self.Softmax(rOutputs[:,i]) for i in range(len(rOutputs[0]))]) 
-        
+        self.rOutputs, self.rDerivatives = self.engine._scale()
+        self.ind = self.engine.ind
+
         #---------------------- PLOTTING ----------------------#
-        self.rOutputs = np.transpose(rOutputs)
-        self.toPlot['00'] = [norms, np.array([self.rOutputs[i] for i in range(len(self.rOutputs))]), 'Norm']
+        self.toPlot['00'] = [norms, self.rOutputs, 'Norm']
         pass
 
     def ScaleDerivative(self):
 
         norms = np.arange(self.num)/self.fs
-        #self.planeOfRotation()
-        rS, rDS = list(), list()
-        
-        for i in range(len(self.weights)):
-            
-            w_Cl = ClVector(Cl(len(self.weights[i])),self.weights[i])
-            proj_w = self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-            rS.append(norms*np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.cos(self.angleBetVectors(proj_w,self.a)))
-            rDS.append(np.ones(self.num)*np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.cos(self.angleBetVectors(proj_w,self.a)))
-        
-        rDerivatives = np.array([self.DSDz(np.array(rS),np.array(rDS),i) for i in range(self.classes.value())])
         
         #---------------------- PLOTTING ----------------------#
-        self.rDerivatives = np.array(rDerivatives)
         self.toPlot['10'] = [norms, self.rDerivatives, 'Norm Derivative']
         pass
 
     def Rotate(self):
 
         thetas = np.arange(self.num)/(10*self.fs)*np.pi
-        e = 0.0001
-        #ind = self.planeOfRotation()
-        w_Cl = ClVector(Cl(len(self.weights[self.ind])),self.weights[self.ind])
-        proj_wj =  self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-        wja = self.angleBetVectors(proj_wj, self.a)
-        aOutputs = list()
-
-        for i in range(len(self.weights)):
-            
-            w_Cl = ClVector(Cl(len(self.weights[i])),self.weights[i])
-            proj_w = self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-            wia = self.angleBetVectors(proj_w, self.a)
-            wij = self.angleBetVectors(proj_w, proj_wj)
-            if abs(wia+wij-wja)<e or abs(wia-wij-wja)<e:
-                wia = -wia
-            aOutputs.append(np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.cos(thetas+wia))
-
-        aOutputs = np.array(aOutputs)
-        aOutputs = np.array([self.Softmax(aOutputs[:,i]) for i in range(len(aOutputs[0]))]) 
+        self.aOutputs, self.aDerivatives = self.engine._rotate()
 
         #---------------------- PLOTTING ----------------------#
-        self.aOutputs = np.transpose(aOutputs)
-        self.toPlot['01'] = [thetas, np.array([self.aOutputs[i] for i in range(len(self.aOutputs))]), 'Angle']
+        self.toPlot['01'] = [thetas, self.aOutputs, 'Angle']
         pass
 
     def RotateDerivative(self):
 
         thetas = np.arange(self.num)/(10*self.fs)*np.pi
-        e = 0.0001
-        #ind = self.planeOfRotation()
-        w_Cl = ClVector(Cl(len(self.weights[self.ind])),self.weights[self.ind])
-        proj_wj =  self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-        wja = self.angleBetVectors(proj_wj, self.a)
-        aS, aDS = list(), list()
-
-        for i in range(len(self.weights)):
-            
-            w_Cl = ClVector(Cl(len(self.weights[i])),self.weights[i])
-            proj_w = self.rotateNd(w_Cl**self.pOR,-self.pOR,np.pi/2)._transform2numpy()
-            wia = self.angleBetVectors(proj_w, self.a)
-            wij = self.angleBetVectors(proj_w, proj_wj)
-            if abs(wia+wij-wja)<e or abs(wia+wij-wja)<e:
-                wia = -wia
-            aS.append(np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.cos(thetas+wia))
-            aDS.append(-1*np.linalg.norm(self.a)*np.linalg.norm(proj_w)*np.sin(thetas+wia))
-
-        aDerivatives = np.array([self.DSDz(np.array(aS),np.array(aDS),i) for i in range(self.classes.value())])
 
         #---------------------- PLOTTING ----------------------#
-        self.aDerivatives = np.array(aDerivatives)
         self.toPlot['11'] = [thetas, self.aDerivatives, 'Angle Derivative']
         pass
 
-    def angleBetVectors(self, vector1, vector2):
-        arc = np.dot(vector1,vector2)/(np.linalg.norm(vector1)*np.linalg.norm(vector2))
-        if arc > 1 and arc < 1.0001:
-            arc = 1
-        return np.arccos(arc)
-
-    def planeOfRotation(self):
-        
-        ind = np.argmin([self.angleBetVectors(self.a, self.weights[i]) for i in range(len(self.weights))])
-        a_Cl = ClVector(Cl(len(self.a)), self.a)
-        w_Cl = ClVector(Cl(len(self.weights[ind])), self.weights[ind])
-        self.pOR = (a_Cl^w_Cl)._normalize()
-        return ind
-
-    def rotateNd(self, nVector, rotationPlane, rotationTheta=0):
-    
-        cl = Cl(nVector.dimensions)
-        rotor  = ClNumber(cl,{'': np.cos(rotationTheta/2)}) - np.sin(rotationTheta/2)*rotationPlane
-        rotorS = ClNumber(cl,{'': np.cos(rotationTheta/2)}) + np.sin(rotationTheta/2)*rotationPlane
-        return rotor*nVector*rotorS
-
-    def DSDz(self,sigs,dSigs,ind):
-        
-        numerator = np.sum([(dSigs[ind]-dSigs[c])*np.exp(s) for c,s in enumerate(sigs)],axis=0)
-        denominator = np.sum([np.exp(s) for s in sigs],axis=0)
-        coef = self.Softmax(sigs)[ind]
-        return coef*numerator/denominator
-
-
 if __name__ == "__main__":
     qapp = QtWidgets.QApplication(sys.argv)
     app = ApplicationWindow()